@@ -0,0 +1,166 @@
+import json
+import math
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from common import load_input_from_file, Pos
+from generators import generate, generators, sweep_size
+from main import find_input_file, find_puzzles, get_solution
+from solutions import day1, day2, day4, day5, day7, day8, day9, day10, day11, day12, day13, day14, day15, day16
+
+
+# input parsing step of each day, timed separately from the full solution
+parsers: Dict[int, Callable[[str], Any]] = {
+    1: day1.parse_elves,
+    2: day2.count_guide_lines,
+    4: day4.iter_elf_pairs,
+    5: day5.read_all,
+    7: day7.parse_input,
+    8: day8.read_input,
+    9: day9.read_input,
+    10: day10.read_input,
+    11: day11.read_input,
+    12: day12.read_input,
+    13: day13.read_input,
+    14: lambda input_str: day14.read_input(input_str, start_point=Pos(500, 0), prt2=False),
+    15: day15.read_input,
+    16: day16.read_input,
+}
+
+
+def measure(func: Callable[[str], Any], arg: str, repeat: int, warmup: int) -> List[float]:
+    times: List[float] = []
+    for i in range(warmup + repeat):
+        s_time = time.perf_counter()
+        res = func(arg)
+        if isinstance(res, Iterator):
+            # lazy parsers only do their work when consumed
+            for _ in res:
+                pass
+        elapsed = time.perf_counter() - s_time
+        if i >= warmup:
+            times.append(elapsed)
+    return times
+
+
+def summarize(times: List[float]) -> Dict[str, float]:
+    st = sorted(times)
+    return {
+        'runs': len(st),
+        'min': st[0],
+        'median': statistics.median(st),
+        'p95': st[max(0, math.ceil(len(st) * 0.95) - 1)],
+    }
+
+
+def bench_puzzle(day: int, part: int, puzzle_input: str, repeat: int, warmup: int) -> Dict[str, Any]:
+    result: Dict[str, Any] = {'input_bytes': len(puzzle_input.encode('utf8'))}
+    if day in parsers:
+        result['parse'] = summarize(measure(parsers[day], puzzle_input, repeat, warmup))
+        result['parse']['mb_per_s'] = result['input_bytes'] / max(result['parse']['median'], 1e-9) / 1e6
+    solution = summarize(measure(get_solution(day, part), puzzle_input, repeat, warmup))
+    result['solution'] = solution
+    result['solve_median'] = solution['median'] - result['parse']['median'] if 'parse' in result else None
+    return result
+
+
+def compare_to_baseline(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+                        tolerance_pct: float) -> List[str]:
+    regressions: List[str] = []
+    for puzzle_id, res in results.items():
+        if puzzle_id not in baseline:
+            continue
+        for phase in ('parse', 'solution'):
+            if phase not in res or phase not in baseline[puzzle_id]:
+                continue
+            old, new = baseline[puzzle_id][phase]['median'], res[phase]['median']
+            if new > old * (1 + tolerance_pct / 100):
+                regressions.append(f'{puzzle_id} {phase}: {old * 1000:.3f}ms -> {new * 1000:.3f}ms '
+                                   f'(+{(new / old - 1) * 100:.1f}%)')
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, Any]]):
+    print(f'{"puzzle":>14} {"phase":>8} {"min":>10} {"median":>10} {"p95":>10} {"throughput":>12}')
+    for puzzle_id, res in results.items():
+        for phase in ('parse', 'solution'):
+            if phase in res:
+                st = res[phase]
+                throughput = f'{st["mb_per_s"]:8.2f}MB/s' if 'mb_per_s' in st else ''
+                print(f'{puzzle_id:>14} {phase:>8} {st["min"] * 1000:8.3f}ms {st["median"] * 1000:8.3f}ms '
+                      f'{st["p95"] * 1000:8.3f}ms {throughput}'.rstrip())
+
+
+def run_benchmarks(days: Optional[List[int]], skip: List[str], repeat: int, warmup: int) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    inputs: Dict[Path, str] = {}
+    for day, part in find_puzzles(days):
+        puzzle_id = f'd{day}p{part}'
+        if puzzle_id in skip:
+            continue
+        input_file = find_input_file(day, part)
+        if input_file not in inputs:
+            inputs[input_file] = load_input_from_file(input_file)
+        results[puzzle_id] = bench_puzzle(day, part, inputs[input_file], repeat, warmup)
+    return results
+
+
+def run_sweep(days: Optional[List[int]], sizes: List[int], seed: int, skip: List[str], repeat: int,
+              warmup: int) -> Dict[str, Dict[str, Any]]:
+    # benchmarks every puzzle on generated inputs of growing size, results are keyed as "dNpM@size".
+    # sizes a generator can't handle are reported and skipped
+    results: Dict[str, Dict[str, Any]] = {}
+    puzzles = [p for p in find_puzzles(days) if p[0] in generators and f'd{p[0]}p{p[1]}' not in skip]
+    for day in sorted({d for d, _ in puzzles}):
+        for size in sizes:
+            gen_size = sweep_size(day, size)
+            try:
+                puzzle_input = generate(day, gen_size, seed)
+            except RuntimeError as e:
+                print(f'Skipping day {day} at size {size} (generator size {gen_size}): {e}', file=sys.stderr)
+                continue
+            for part in (p for d, p in puzzles if d == day):
+                result = bench_puzzle(day, part, puzzle_input, repeat, warmup)
+                result['generator_size'] = gen_size
+                results[f'd{day}p{part}@{size}'] = result
+    return results
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Benchmark puzzle solutions and compare them against a saved baseline')
+    parser.add_argument('--days', type=int, nargs='*', default=None)
+    parser.add_argument('--skip', nargs='*', default=['d15p2', 'd16p2'], help='puzzle ids to leave out')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--output', type=Path, default=Path('bench_results.json'))
+    parser.add_argument('--baseline', type=Path, default=None)
+    parser.add_argument('--tolerance', type=float, default=10.0, help='allowed slowdown in percent')
+    parser.add_argument('--sweep', type=int, nargs='+', default=None, metavar='SIZE',
+                        help='benchmark on generated inputs of about this many lines or grid cells instead of the '
+                             'puzzle inputs')
+    parser.add_argument('--seed', type=int, default=0, help='seed for generated inputs')
+    args = parser.parse_args()
+
+    if args.sweep is None:
+        bench_results = run_benchmarks(days=args.days, skip=args.skip, repeat=args.repeat, warmup=args.warmup)
+    else:
+        bench_results = run_sweep(days=args.days, sizes=args.sweep, seed=args.seed, skip=args.skip,
+                                  repeat=args.repeat, warmup=args.warmup)
+    print_results(bench_results)
+    with open(args.output, mode='wt', encoding='utf8') as f:
+        json.dump(bench_results, f, indent=2)
+
+    if args.baseline is not None:
+        with open(args.baseline, mode='rt', encoding='utf8') as f:
+            baseline_results = json.load(f)
+        regression_list = compare_to_baseline(bench_results, baseline_results, args.tolerance)
+        if regression_list:
+            print(f'Performance regressions over {args.tolerance}%:')
+            for r in regression_list:
+                print(f'  {r}')
+            sys.exit(1)
+        print('No performance regressions')
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Union
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode('utf8')).hexdigest()
+
+
+def hash_files(paths: Iterable[Path]) -> str:
+    h = hashlib.sha256()
+    for path in paths:
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def solution_sources(day: int) -> Iterable[Path]:
+    # a day's answers depend on its own module and on the shared helpers
+    return Path('solutions', f'day{day}.py'), Path('common.py')
+
+
+class AnswerCache:
+    def __init__(self, cache_file: Union[Path, str] = Path('.cache', 'answers.json'), max_entries: int = 256):
+        if max_entries < 1:
+            raise RuntimeError('cache must be able to hold at least one entry')
+        self.cache_file = Path(cache_file)
+        self.max_entries = max_entries
+        self._entries: Optional[Dict[str, Dict[str, Union[str, float]]]] = None
+        # sources are hashed once per cache object, so a run hashes each day's files once
+        self._source_hashes: Dict[int, str] = {}
+        self.dirty = False
+
+    def source_hash(self, day: int) -> str:
+        if day not in self._source_hashes:
+            self._source_hashes[day] = hash_files(solution_sources(day))
+        return self._source_hashes[day]
+
+    def make_key(self, day: int, part: int, puzzle_input: str) -> str:
+        return f'd{day}p{part}:{self.source_hash(day)}:{hash_text(puzzle_input)}'
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Union[str, float]]]:
+        if self._entries is None:
+            try:
+                with open(self.cache_file, mode='rt', encoding='utf8') as f:
+                    self._entries = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        # only updated in memory, callers save once when they are done
+        entry['last_used'] = time.time()
+        self.dirty = True
+        return entry['answer']
+
+    def put(self, key: str, answer: str):
+        self.entries[key] = {'answer': answer, 'last_used': time.time()}
+        self.evict()
+        self.dirty = True
+
+    def evict(self):
+        entries = self.entries
+        if len(entries) <= self.max_entries:
+            return
+        lru_keys = sorted(entries, key=lambda k: entries[k]['last_used'])
+        for k in lru_keys[:len(entries) - self.max_entries]:
+            del entries[k]
+
+    def clear(self):
+        self._entries = {}
+        self.save()
+
+    def save(self):
+        if self._entries is None:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_name(self.cache_file.name + '.tmp')
+        with open(tmp_file, mode='wt', encoding='utf8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_file, self.cache_file)
+        self.dirty = False
+
+    def save_if_dirty(self):
+        if self.dirty:
+            self.save()
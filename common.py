@@ -1,12 +1,17 @@
+import itertools
 from abc import ABC, abstractmethod
+from array import array
 from enum import Enum
 from io import StringIO
+from mmap import mmap, ACCESS_READ
 from os import PathLike
 from pathlib import Path
-from typing import Callable, Iterator, Union, Tuple
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Match, Optional, Pattern, Sequence, Union, Tuple
 
 
 PuzzleSolution = Callable[[str], str]
+ByteBuffer = Union[bytes, bytearray, mmap]
+InputData = Union[str, ByteBuffer]
 
 
 class Solution(ABC):
@@ -23,6 +28,70 @@ def line_iterator(multiline_string: str, strip_newline: bool = True) -> Iterator
         yield line
 
 
+def byte_line_iterator(buffer: ByteBuffer, strip_newline: bool = True) -> Iterator[bytes]:
+    # only ever copies one line at a time out of the buffer
+    start, end = 0, len(buffer)
+    while start < end:
+        line_end = buffer.find(b'\n', start)
+        line_end = end if line_end < 0 else line_end + 1
+        line = buffer[start:line_end]
+        if strip_newline:
+            line = line.rstrip(b'\r\n')
+        yield line
+        start = line_end
+
+
+def iter_lines(input_data: InputData, strip_newline: bool = True) -> Iterator[Union[str, bytes]]:
+    if isinstance(input_data, str):
+        return line_iterator(input_data, strip_newline=strip_newline)
+    return byte_line_iterator(input_data, strip_newline=strip_newline)
+
+
+def iter_line_matches(regex: Pattern, text: str, first_line: int = 1) -> Iterator[Match]:
+    # runs one finditer over the whole text, regex has to match complete lines (re.MULTILINE with ^ and $)
+    pos = 0
+    for match in itertools.chain(regex.finditer(text), [None]):
+        gap = text[pos:len(text) if match is None else match.start()]
+        if gap.strip('\r\n'):
+            bad_start = pos + len(gap) - len(gap.lstrip('\r\n'))
+            bad_end = text.find('\n', bad_start)
+            bad_line = text[bad_start:bad_end if bad_end >= 0 else len(text)].rstrip('\r')
+            raise RuntimeError(f'Invalid input on line {text.count(chr(10), 0, bad_start) + first_line}: "{bad_line}"')
+        if match is None:
+            return
+        yield match
+        pos = match.end()
+
+
+def iter_chunks(source: Union[Path, str, ByteBuffer, BinaryIO], chunk_size: int = 1 << 20) -> Iterator[bytes]:
+    # source is a file path, an already loaded buffer or an open binary stream (file, socket makefile, pipe)
+    if isinstance(source, (bytes, bytearray, mmap)):
+        for start in range(0, len(source), chunk_size):
+            yield source[start:start + chunk_size]
+        return
+    if hasattr(source, 'read'):
+        yield from iter(lambda: source.read(chunk_size), b'')
+        return
+    with open(source, mode='rb') as f:
+        yield from iter(lambda: f.read(chunk_size), b'')
+
+
+def chunked_line_iterator(chunks: Iterable[bytes], strip_newline: bool = True) -> Iterator[bytes]:
+    # lines can span chunk boundaries, only the unfinished tail of each chunk is carried over
+    rest = b''
+    for chunk in chunks:
+        lines = (rest + chunk).split(b'\n')
+        rest = lines.pop()
+        for line in lines:
+            yield line.rstrip(b'\r') if strip_newline else line + b'\n'
+    if rest:
+        yield rest.rstrip(b'\r') if strip_newline else rest
+
+
+def as_str(s: Union[str, bytes]) -> str:
+    return s if isinstance(s, str) else s.decode('utf8')
+
+
 def load_input_from_file(path: Union[Path, str]) -> str:
     if not isinstance(path, PathLike):
         path = Path(path)
@@ -30,6 +99,130 @@ def load_input_from_file(path: Union[Path, str]) -> str:
         return f.read()
 
 
+def load_input_mmap(path: Union[Path, str]) -> ByteBuffer:
+    with open(path, mode='rb') as f:
+        if f.seek(0, 2) == 0:
+            # empty files cannot be mapped
+            return b''
+        # the mapping stays valid after the file is closed
+        return mmap(f.fileno(), 0, access=ACCESS_READ)
+
+
+# optional numpy parsing
+
+# below this input size parsing stays in pure Python, importing numpy would cost more than it saves
+numpy_min_input_size = 1 << 20
+_numpy = None
+
+
+def optional_numpy(input_size: Optional[int] = None):
+    global _numpy
+    if input_size is not None and input_size < numpy_min_input_size:
+        return None
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+def as_byte_array(input_data: InputData):
+    np = optional_numpy()
+    if np is None:
+        raise RuntimeError('numpy is not installed')
+    if isinstance(input_data, str):
+        input_data = input_data.encode('utf8')
+    return np.frombuffer(input_data, dtype=np.uint8)
+
+
+def _int_spans(buf) -> Tuple:
+    np = optional_numpy()
+    is_digit = (buf >= 48) & (buf <= 57)
+    edges = np.diff(is_digit.astype(np.int8), prepend=np.int8(0), append=np.int8(0))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1), is_digit
+
+
+def extract_ints(input_data: InputData, signed: bool = True):
+    # every run of digits in the buffer becomes one int64, a '-' right before a run makes it negative
+    np = optional_numpy()
+    buf = as_byte_array(input_data)
+    starts, ends, is_digit = _int_spans(buf)
+    if len(starts) == 0:
+        return np.zeros(0, dtype=np.int64)
+    lengths = ends - starts
+    digit_index = np.flatnonzero(is_digit)
+    place = np.repeat(ends, lengths) - digit_index - 1
+    digit_values = (buf[digit_index] - 48).astype(np.int64) * np.power(np.int64(10), place)
+    values = np.add.reduceat(digit_values, np.cumsum(lengths) - lengths)
+    if signed:
+        negative = np.zeros(len(starts), dtype=bool)
+        has_prefix = starts > 0
+        negative[has_prefix] = buf[starts[has_prefix] - 1] == 45
+        values[negative] *= -1
+    return values
+
+
+def extract_int_groups(input_data: InputData) -> Optional[Tuple]:
+    # returns (values, group of each value), groups are separated by blank lines. Every line has to be a single
+    # run of digits or empty, otherwise returns None so the caller can run its line parser instead
+    np = optional_numpy()
+    buf = as_byte_array(input_data)
+    starts, ends, is_digit = _int_spans(buf)
+    newline = buf == 10
+    carriage_return = buf == 13
+    carriage_return[:-1] &= newline[1:]
+    if not (is_digit | newline | carriage_return).all() or (ends - starts > 18).any():
+        return None
+    values = extract_ints(buf, signed=False)
+    newlines = np.flatnonzero(buf == 10)
+    gaps = np.diff(newlines)
+    blank = (gaps == 1) | ((gaps == 2) & (buf[newlines[:-1] + 1] == 13))
+    return values, np.searchsorted(newlines[1:][blank], starts)
+
+
+def extract_line_records(input_data: InputData, template: Sequence[bytes], signed: bool = True):
+    # every line has to be template[0] int template[1] int ... template[-1], '?' in the template matches any byte.
+    # returns one row of ints per line, or None when any line does not match (blank lines included), so the
+    # caller can run its line parser to report the error with its line number
+    np = optional_numpy()
+    buf = as_byte_array(input_data)
+    width = len(template) - 1
+    starts, ends, _ = _int_spans(buf)
+    if width < 1 or len(starts) == 0 or len(starts) % width != 0:
+        return None
+    if signed:
+        starts = starts - ((starts > 0) & (buf[np.maximum(starts - 1, 0)] == 45))
+    line_starts = np.concatenate(([0], np.flatnonzero(buf == 10) + 1))
+    if line_starts[-1] == len(buf):
+        line_starts = line_starts[:-1]
+    if len(line_starts) * width != len(starts):
+        return None
+    line_ends = np.append(line_starts[1:] - 1, len(buf))
+    line_ends -= (line_ends > line_starts) & (buf[np.maximum(line_ends - 1, 0)] == 13)
+    # the text around the ints of each line, gap j runs from gap_starts[:, j] to gap_ends[:, j]
+    gap_starts = np.column_stack((line_starts, ends.reshape(-1, width)))
+    gap_ends = np.column_stack((starts.reshape(-1, width), line_ends))
+    for j, text in enumerate(template):
+        if (gap_ends[:, j] - gap_starts[:, j] != len(text)).any():
+            return None
+        expected = np.frombuffer(text, dtype=np.uint8)
+        fixed = expected != ord('?')
+        if fixed.any():
+            gap = buf[gap_starts[:, j, None] + np.flatnonzero(fixed)]
+            if (gap != expected[fixed]).any():
+                return None
+    return extract_ints(buf, signed=signed).reshape(-1, width)
+
+
+def line_first_bytes(input_data: InputData):
+    np = optional_numpy()
+    buf = as_byte_array(input_data)
+    line_starts = np.concatenate(([0], np.flatnonzero(buf == 10) + 1))
+    return buf[line_starts[line_starts < len(buf)]]
+
+
 # 2D grids
 
 class Direction(Enum):
@@ -60,3 +253,168 @@ class Pos:
 
     def __hash__(self):
         return hash((self.x, self.y))
+
+
+# packed coordinates: (x, y) stored in a single int, so stepping is one addition and hashing is free
+packed_bias = 1 << 31
+packed_stride = 1 << 32
+
+
+def pack(x: int, y: int) -> int:
+    return (y + packed_bias) * packed_stride + x + packed_bias
+
+
+def unpack(packed: int) -> Tuple[int, int]:
+    y, x = divmod(packed, packed_stride)
+    return x - packed_bias, y - packed_bias
+
+
+def pack_offset(dx: int, dy: int, stride: int = packed_stride) -> int:
+    return dy * stride + dx
+
+
+def pack_pos(pos: Pos) -> int:
+    return pack(pos.x, pos.y)
+
+
+def unpack_pos(packed: int) -> Pos:
+    return Pos(*unpack(packed))
+
+
+packed_offsets: Dict[Direction, int] = {d: pack_offset(*d.value) for d in Direction}
+
+
+class Grid2D:
+    __slots__ = ['width', 'height', 'cells']
+
+    # translation table that turns digit characters into their values
+    digit_values = bytes.maketrans(b'0123456789', bytes(range(10)))
+
+    def __init__(self, width: int, height: int, cells: Optional[bytearray] = None, fill: int = 0):
+        if width < 1 or height < 1:
+            raise RuntimeError('grid width and height must be positive')
+        if cells is None:
+            cells = bytearray([fill]) * (width * height)
+        elif len(cells) != width * height:
+            raise RuntimeError(f'expected {width * height} cells, got {len(cells)}')
+        self.width = width
+        self.height = height
+        self.cells = cells
+
+    @classmethod
+    def from_text(cls, text: InputData, translation: Optional[bytes] = None) -> 'Grid2D':
+        data = text.encode('utf8') if isinstance(text, str) else bytes(text)
+        rows = data.splitlines()
+        if not rows:
+            raise RuntimeError('height cannot be zero')
+        width = len(rows[0])
+        if any(len(row) != width for row in rows):
+            raise RuntimeError('inconsistent row width')
+        cells = bytearray(b''.join(rows))
+        if translation is not None:
+            cells = cells.translate(translation)
+        return cls(width=width, height=len(rows), cells=cells)
+
+    def index(self, x: int, y: int) -> int:
+        return y * self.width + x
+
+    def offset(self, direction: Direction) -> int:
+        # flat indices are packed coordinates with the grid width as stride
+        return pack_offset(*direction.value, stride=self.width)
+
+    def pos_of(self, index: int) -> Pos:
+        return Pos(index % self.width, index // self.width)
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def __getitem__(self, pos: Pos) -> int:
+        return self.cells[pos.y * self.width + pos.x]
+
+    def __setitem__(self, pos: Pos, value: int):
+        self.cells[pos.y * self.width + pos.x] = value
+
+    def row(self, y: int) -> memoryview:
+        return memoryview(self.cells)[y * self.width:(y + 1) * self.width]
+
+    def column(self, x: int) -> memoryview:
+        return memoryview(self.cells)[x::self.width]
+
+    def neighbors(self, index: int) -> Iterator[int]:
+        # orthogonal neighbours in Direction order (up, down, left, right) that are inside the grid
+        w = self.width
+        if index >= w:
+            yield index - w
+        if index + w < len(self.cells):
+            yield index + w
+        x = index % w
+        if x > 0:
+            yield index - 1
+        if x < w - 1:
+            yield index + 1
+
+
+# graphs
+
+class Graph:
+    # compressed sparse row adjacency: the neighbours of node n are targets[offsets[n]:offsets[n + 1]]
+    __slots__ = ['offsets', 'targets']
+
+    def __init__(self, offsets: array, targets: array):
+        if len(offsets) < 1 or offsets[-1] != len(targets):
+            raise RuntimeError('offsets do not match targets')
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Iterable[Iterable[int]]) -> 'Graph':
+        offsets, targets = array('l', [0]), array('l')
+        for neighbours in adjacency:
+            targets.extend(neighbours)
+            offsets.append(len(targets))
+        return cls(offsets, targets)
+
+    @property
+    def node_count(self) -> int:
+        return len(self.offsets) - 1
+
+    def neighbors(self, node: int) -> array:
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+
+def bfs(graph: Graph, sources: Iterable[int], target: Optional[int] = None) -> Tuple[List[int], List[int]]:
+    # returns (distance, parent) for every node, -1 where unreached; stops once target is dequeued
+    distance = [-1] * graph.node_count
+    parent = [-1] * graph.node_count
+    offsets, targets = graph.offsets, graph.targets
+    queue: List[int] = []
+    for s in sources:
+        if distance[s] < 0:
+            distance[s] = 0
+            queue.append(s)
+    for node in queue:
+        if node == target:
+            break
+        d = distance[node] + 1
+        for n in targets[offsets[node]:offsets[node + 1]]:
+            if distance[n] < 0:
+                distance[n] = d
+                parent[n] = node
+                queue.append(n)
+    return distance, parent
+
+
+def reconstruct_path(parent: List[int], node: int) -> List[int]:
+    # nodes from the bfs source to node, both included
+    path = [node]
+    while parent[node] >= 0:
+        node = parent[node]
+        path.append(node)
+    path.reverse()
+    return path
+
+
+def all_pairs_distances(graph: Graph, nodes: Optional[Iterable[int]] = None) -> Dict[int, List[int]]:
+    if nodes is None:
+        nodes = range(graph.node_count)
+    return {n: bfs(graph, (n,))[0] for n in nodes}
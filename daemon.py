@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+import tempfile
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from common import load_input_from_file
+from main import PuzzleResult, find_input_file, solve_puzzle
+from registry import registry
+
+
+default_socket_path = Path(tempfile.gettempdir(), 'aoc2022-solver.sock')
+max_request_size = 256 * 1024 * 1024
+
+
+def warm_up_worker():
+    # every worker imports all solution modules once, so no request pays for it
+    registry.import_all()
+
+
+class SolverDaemon:
+    def __init__(self, socket_path: Union[Path, str] = default_socket_path, max_workers: Optional[int] = None):
+        self.socket_path = Path(socket_path)
+        self.executor = ProcessPoolExecutor(max_workers=max_workers, initializer=warm_up_worker)
+
+    async def solve(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            day, part, puzzle_input = int(request['day']), int(request['part']), request['input']
+        except (KeyError, TypeError, ValueError) as e:
+            return {'error': f'Invalid request: {type(e).__name__}: {e}'}
+        if (day, part) not in registry.index:
+            return {'error': f'd{day}p{part} has no solution'}
+        # solving happens in the worker pool, a slow puzzle only blocks one worker
+        loop = asyncio.get_running_loop()
+        result: PuzzleResult = await loop.run_in_executor(self.executor, solve_puzzle, day, part, puzzle_input)
+        return {'answer': result.answer, 'error': result.error, 'wall_time': result.wall_time}
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(json.dumps({'error': 'Request too large'}).encode('utf8') + b'\n')
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    response = {'error': f'Invalid request: {e}'}
+                else:
+                    response = await self.solve(request)
+                writer.write(json.dumps(response).encode('utf8') + b'\n')
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        server = await asyncio.start_unix_server(self.handle_client, path=str(self.socket_path),
+                                                 limit=max_request_size)
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=False)
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+    def run(self):
+        print(f'Solver daemon listening on {self.socket_path}')
+        try:
+            asyncio.run(self.serve())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+
+
+def request_solution(day: int, part: int, puzzle_input: str,
+                     socket_path: Union[Path, str] = default_socket_path) -> Dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(os.fspath(socket_path))
+        sock.sendall(json.dumps({'day': day, 'part': part, 'input': puzzle_input}).encode('utf8') + b'\n')
+        with sock.makefile('rb') as f:
+            line = f.readline()
+    if not line:
+        raise RuntimeError('Solver daemon closed the connection without answering')
+    return json.loads(line)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Solver daemon that keeps solution modules warm, and its client')
+    parser.add_argument('--socket', type=Path, default=default_socket_path)
+    commands = parser.add_subparsers(dest='command', required=True)
+    serve_parser = commands.add_parser('serve', help='start the daemon')
+    serve_parser.add_argument('--workers', type=int, default=None)
+    solve_parser = commands.add_parser('solve', help='ask a running daemon to solve a puzzle')
+    solve_parser.add_argument('day', type=int)
+    solve_parser.add_argument('part', type=int)
+    solve_parser.add_argument('--input', type=Path, default=None, help='defaults to the puzzle input in inputs/')
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        SolverDaemon(socket_path=args.socket, max_workers=args.workers).run()
+    else:
+        input_file = args.input if args.input is not None else find_input_file(args.day, args.part)
+        response = request_solution(args.day, args.part, load_input_from_file(input_file), socket_path=args.socket)
+        if response.get('error') is not None:
+            print(f'Error: {response["error"]}')
+        else:
+            print(response['answer'])
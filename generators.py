@@ -0,0 +1,298 @@
+import json
+import math
+import string
+from argparse import ArgumentParser
+from pathlib import Path
+from random import Random
+from typing import Callable, Dict, List, Tuple
+
+
+InputGenerator = Callable[..., str]
+
+
+def gen_day1(size: int, seed: int = 0, max_items: int = 15) -> str:
+    # size: number of elves
+    rng = Random(seed)
+    elves = ('\n'.join(str(rng.randint(1000, 60000)) for _ in range(rng.randint(1, max_items))) for _ in range(size))
+    return '\n\n'.join(elves)
+
+
+def gen_day2(size: int, seed: int = 0) -> str:
+    # size: number of rounds
+    rng = Random(seed)
+    return '\n'.join(f'{rng.choice("ABC")} {rng.choice("XYZ")}' for _ in range(size))
+
+
+def gen_day3(size: int, seed: int = 0, max_compartment: int = 24) -> str:
+    # size: number of rucksacks, rounded up to whole groups of three
+    rng = Random(seed)
+    items = string.ascii_letters
+    lines: List[str] = []
+    for _ in range((size + 2) // 3):
+        badge = rng.choice(items)
+        rest = [c for c in items if c != badge]
+        rng.shuffle(rest)
+        # each rucksack of the group draws from its own pool, so only the badge is shared by all three
+        for pool in (rest[0:17], rest[17:34], rest[34:51]):
+            shared = rng.choice(pool + [badge])
+            others = [c for c in pool if c != shared]
+            split = rng.randint(1, len(others) - 1)
+            left_pool, right_pool = others[:split], others[split:]
+            required = [shared] if shared == badge else [shared, badge]
+            length = rng.randint(len(required) + 1, max_compartment)
+            left = required + rng.choices(left_pool, k=length - len(required))
+            right = [shared] + rng.choices(right_pool, k=length - 1)
+            rng.shuffle(left)
+            rng.shuffle(right)
+            lines.append(''.join(left + right))
+    return '\n'.join(lines)
+
+
+def gen_day4(size: int, seed: int = 0, max_section: int = 99) -> str:
+    # size: number of elf pairs
+    rng = Random(seed)
+    lines: List[str] = []
+    for _ in range(size):
+        a, b = sorted((rng.randint(1, max_section), rng.randint(1, max_section)))
+        c, d = sorted((rng.randint(1, max_section), rng.randint(1, max_section)))
+        lines.append(f'{a}-{b},{c}-{d}')
+    return '\n'.join(lines)
+
+
+def gen_day5(size: int, seed: int = 0, stack_count: int = 9, crates_per_stack: int = 8, max_move: int = 10) -> str:
+    # size: number of moves
+    if stack_count < 2:
+        raise RuntimeError('need at least two stacks to move crates between')
+    rng = Random(seed)
+    heights = [crates_per_stack] * stack_count
+    crate_rows = [' '.join(f'[{rng.choice(string.ascii_uppercase)}]' for _ in range(stack_count))
+                  for _ in range(crates_per_stack)]
+    legend = ' ' + '   '.join(f'{i + 1}' for i in range(stack_count)) + ' '
+    moves: List[str] = []
+    for _ in range(size):
+        # never empty a stack, every stack needs a top crate for the answer
+        from_stack = rng.choice([i for i, h in enumerate(heights) if h > 1])
+        to_stack = rng.choice([i for i in range(stack_count) if i != from_stack])
+        crate_num = rng.randint(1, min(max_move, heights[from_stack] - 1))
+        heights[from_stack] -= crate_num
+        heights[to_stack] += crate_num
+        moves.append(f'move {crate_num} from {from_stack + 1} to {to_stack + 1}')
+    return '\n'.join(crate_rows + [legend, ''] + moves)
+
+
+def gen_day6(size: int, seed: int = 0) -> str:
+    # size: datastream length, markers only show up at the very end
+    rng = Random(seed)
+    filler = ''.join(rng.choice('abc') for _ in range(max(0, size - 14)))
+    return filler + 'defghijklmnopq'
+
+
+def gen_day7(size: int, seed: int = 0, max_files: int = 5, disk_used: int = 50_000_000) -> str:
+    # size: number of directories, file sizes are scaled so the whole tree adds up to roughly disk_used
+    rng = Random(seed)
+    max_file_size = max(1, 4 * disk_used // (size * max(1, max_files)))
+    children: List[List[int]] = [[] for _ in range(size)]
+    names = ['/'] + [f'{"".join(rng.choices(string.ascii_lowercase, k=rng.randint(1, 8)))}{i}' for i in range(1, size)]
+    for i in range(1, size):
+        children[rng.randrange(i)].append(i)
+
+    lines: List[str] = ['$ cd /']
+    stack: List[Tuple[int, int]] = [(0, 0)]
+    while stack:
+        d, ci = stack.pop()
+        if ci == 0:
+            lines.append('$ ls')
+            lines.extend(f'dir {names[c]}' for c in children[d])
+            for fi in range(rng.randint(0, max_files)):
+                lines.append(f'{rng.randint(1, max_file_size)} file{fi}.{rng.choice(("txt", "dat", "log"))}')
+        if ci < len(children[d]):
+            stack.append((d, ci + 1))
+            lines.append(f'$ cd {names[children[d][ci]]}')
+            stack.append((children[d][ci], 0))
+        elif stack:
+            lines.append('$ cd ..')
+    return '\n'.join(lines)
+
+
+def gen_day8(size: int, seed: int = 0, height: int = None) -> str:
+    # size: grid width (and height unless given)
+    rng = Random(seed)
+    return '\n'.join(''.join(rng.choice(string.digits) for _ in range(size)) for _ in range(height or size))
+
+
+def gen_day9(size: int, seed: int = 0, max_distance: int = 20) -> str:
+    # size: number of moves
+    rng = Random(seed)
+    return '\n'.join(f'{rng.choice("UDLR")} {rng.randint(1, max_distance)}' for _ in range(size))
+
+
+def gen_day10(size: int, seed: int = 0) -> str:
+    # size: number of instructions
+    rng = Random(seed)
+    return '\n'.join('noop' if rng.random() < 0.3 else f'addx {rng.randint(-20, 20)}' for _ in range(size))
+
+
+def gen_day11(size: int, seed: int = 0, max_items: int = 8) -> str:
+    # size: number of monkeys
+    if size < 2:
+        raise RuntimeError('need at least two monkeys to throw items between')
+    rng = Random(seed)
+    primes: List[int] = []
+    n = 2
+    while len(primes) < size:
+        if all(n % p for p in primes):
+            primes.append(n)
+        n += 1
+    rng.shuffle(primes)
+    monkeys: List[str] = []
+    for i in range(size):
+        # squaring is left out, it makes part 1 worry levels grow without bound
+        op = f'old * {rng.randint(2, 19)}' if rng.random() < 0.3 else f'old + {rng.randint(1, 8)}'
+        targets = rng.sample([t for t in range(size) if t != i], 2) if size > 2 else [1 - i, 1 - i]
+        items = ', '.join(str(rng.randint(50, 99)) for _ in range(rng.randint(1, max_items)))
+        monkeys.append('\n'.join([
+            f'Monkey {i}:',
+            f'  Starting items: {items}',
+            f'  Operation: new = {op}',
+            f'  Test: divisible by {primes[i]}',
+            f'    If true: throw to monkey {targets[0]}',
+            f'    If false: throw to monkey {targets[1]}',
+        ]))
+    return '\n\n'.join(monkeys)
+
+
+def gen_day12(size: int, seed: int = 0, height: int = None) -> str:
+    # size: map width (and height unless given), at least 26 so the climb can rise by one per column
+    if size < 26:
+        raise RuntimeError('map must be at least 26 columns wide')
+    rng = Random(seed)
+    height = height or size
+    # neighbouring cells never differ by more than one, so every cell is reachable from every other
+    wiggle = [0]
+    for _ in range(height - 1):
+        wiggle.append(max(-3, min(3, wiggle[-1] + rng.choice((-1, 0, 1)))))
+    ramp = [25 * x // (size - 1) for x in range(size)]
+    rows = [[max(0, min(25, r + w)) for r in ramp] for w in wiggle]
+    start_y, end_y = wiggle.index(min(wiggle)), wiggle.index(max(wiggle))
+    lines: List[str] = []
+    for y, row in enumerate(rows):
+        line = [chr(97 + h) for h in row]
+        if y == start_y:
+            line[0] = 'S'
+        if y == end_y:
+            line[-1] = 'E'
+        lines.append(''.join(line))
+    return '\n'.join(lines)
+
+
+def gen_day13(size: int, seed: int = 0, max_depth: int = 4, max_len: int = 5) -> str:
+    # size: number of packet pairs
+    rng = Random(seed)
+
+    def packet(depth: int):
+        return [rng.randint(0, 10) if depth >= max_depth or rng.random() < 0.6 else packet(depth + 1)
+                for _ in range(rng.randint(0, max_len))]
+
+    pairs = (f'{json.dumps(packet(1), separators=(",", ":"))}\n{json.dumps(packet(1), separators=(",", ":"))}'
+             for _ in range(size))
+    return '\n\n'.join(pairs)
+
+
+def gen_day14(size: int, seed: int = 0, depth: int = 170, spread: int = 60, max_points: int = 6) -> str:
+    # size: number of rock paths
+    rng = Random(seed)
+    lines: List[str] = []
+    for _ in range(size):
+        x, y = rng.randint(500 - spread, 500 + spread), rng.randint(2, depth)
+        points = [(x, y)]
+        for i in range(rng.randint(1, max_points)):
+            if i % 2 == 0:
+                x = max(500 - spread, min(500 + spread, x + rng.randint(-8, 8)))
+            else:
+                y = max(2, min(depth, y + rng.randint(-8, 8)))
+            points.append((x, y))
+        lines.append(' -> '.join(f'{px},{py}' for px, py in points))
+    return '\n'.join(lines)
+
+
+def gen_day15(size: int, seed: int = 0, scale: int = 4_000_000) -> str:
+    # size: number of sensors; one hidden point is kept out of every sensor's range
+    rng = Random(seed)
+    hx, hy = rng.randint(0, scale), rng.randint(0, scale)
+    lines: List[str] = []
+    for _ in range(size):
+        sx, sy = rng.randint(-scale // 10, scale + scale // 10), rng.randint(-scale // 10, scale + scale // 10)
+        radius = max(0, abs(sx - hx) + abs(sy - hy) - 1 - rng.randint(0, scale // 100))
+        dx = rng.randint(-radius, radius)
+        dy = (radius - abs(dx)) * rng.choice((-1, 1))
+        lines.append(f'Sensor at x={sx}, y={sy}: closest beacon is at x={sx + dx}, y={sy + dy}')
+    return '\n'.join(lines)
+
+
+def gen_day16(size: int, seed: int = 0, functional_ratio: float = 0.25, extra_edges: float = 0.5) -> str:
+    # size: number of valves
+    names = [a + b for a in string.ascii_uppercase for b in string.ascii_uppercase]
+    if not 1 < size <= len(names):
+        raise RuntimeError(f'valve count must be between 2 and {len(names)}')
+    rng = Random(seed)
+    names.remove('AA')
+    names = ['AA'] + rng.sample(names, size - 1)
+    tunnels: List[List[int]] = [[] for _ in range(size)]
+
+    def connect(a: int, b: int):
+        if a != b and b not in tunnels[a]:
+            tunnels[a].append(b)
+            tunnels[b].append(a)
+
+    for i in range(1, size):
+        connect(i, rng.randrange(i))
+    for _ in range(int(size * extra_edges)):
+        connect(rng.randrange(size), rng.randrange(size))
+    lines: List[str] = []
+    for i, name in enumerate(names):
+        flow_rate = rng.randint(1, 25) if i > 0 and rng.random() < functional_ratio else 0
+        targets = ', '.join(names[t] for t in tunnels[i])
+        if len(tunnels[i]) == 1:
+            lines.append(f'Valve {name} has flow rate={flow_rate}; tunnel leads to valve {targets}')
+        else:
+            lines.append(f'Valve {name} has flow rate={flow_rate}; tunnels lead to valves {targets}')
+    return '\n'.join(lines)
+
+
+generators: Dict[int, InputGenerator] = {
+    1: gen_day1, 2: gen_day2, 3: gen_day3, 4: gen_day4, 5: gen_day5, 6: gen_day6, 7: gen_day7, 8: gen_day8,
+    9: gen_day9, 10: gen_day10, 11: gen_day11, 12: gen_day12, 13: gen_day13, 14: gen_day14, 15: gen_day15,
+    16: gen_day16,
+}
+
+
+# benchmark sweeps use one size for every day, roughly the number of input lines or grid cells. Days whose
+# generator takes a grid side get its square root so all days grow at the same rate
+sweep_scales: Dict[int, Callable[[int], int]] = {
+    8: math.isqrt, 12: math.isqrt,
+}
+
+
+def sweep_size(day: int, size: int) -> int:
+    return sweep_scales[day](size) if day in sweep_scales else size
+
+
+def generate(day: int, size: int, seed: int = 0, **kwargs) -> str:
+    if day not in generators:
+        raise RuntimeError(f'no input generator for day {day}')
+    return generators[day](size, seed, **kwargs)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Generate a synthetic puzzle input')
+    parser.add_argument('day', type=int)
+    parser.add_argument('size', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=Path, default=None, help='write to a file instead of stdout')
+    args = parser.parse_args()
+    generated = generate(args.day, args.size, args.seed)
+    if args.output is None:
+        print(generated)
+    else:
+        with open(args.output, mode='wt', encoding='utf8', newline='\n') as f:
+            f.write(generated)
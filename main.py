@@ -1,26 +1,143 @@
-from importlib import import_module
+import time
+from argparse import ArgumentParser
 from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
+from cache import AnswerCache
 from common import load_input_from_file, PuzzleSolution
+from profiling import ProfileMode, profile_call
+from registry import registry
 
 
-def run_puzzle(day: int, part: int):
-    puzzle_id = f'd{day}p{part}'
-    mod_name = f'day{day}'
+class PuzzleResult(NamedTuple):
+    day: int
+    part: int
+    answer: Optional[str]
+    wall_time: float
+    error: Optional[str] = None
+    cached: bool = False
+    profile_report: Optional[str] = None
+
+    @property
+    def puzzle_id(self) -> str:
+        return f'd{self.day}p{self.part}'
+
 
-    solution_name = f'{puzzle_id}_solution'
-    solution_module = import_module(f'solutions.{mod_name}')
-    solution_function: PuzzleSolution = getattr(solution_module, solution_name)
+def get_solution(day: int, part: int) -> PuzzleSolution:
+    return registry.get(day, part)
 
+
+def find_input_file(day: int, part: int) -> Path:
     puzzle_input_file = Path('inputs', f'd{day}p{part}_input.txt')
     if not puzzle_input_file.is_file():
         puzzle_input_file = Path(puzzle_input_file.parent, f'd{day}_input.txt')
         if not puzzle_input_file.is_file():
-            raise RuntimeError(f'{puzzle_id} is missing an input file')
-    puzzle_input = load_input_from_file(puzzle_input_file)
+            raise RuntimeError(f'd{day}p{part} is missing an input file')
+    return puzzle_input_file
+
+
+def find_puzzles(days: Optional[List[int]] = None) -> List[Tuple[int, int]]:
+    return registry.puzzles(days)
+
+
+def solve_puzzle(day: int, part: int, puzzle_input: str, profile: Optional[ProfileMode] = None) -> PuzzleResult:
+    profile_report = None
+    s_time = time.perf_counter()
+    try:
+        if profile is None:
+            answer = get_solution(day, part)(puzzle_input)
+        else:
+            answer, profile_report = profile_call(get_solution(day, part), puzzle_input, f'd{day}p{part}', profile)
+    except Exception as e:
+        return PuzzleResult(day, part, None, time.perf_counter() - s_time, f'{type(e).__name__}: {e}')
+    wall_time = time.perf_counter() - s_time
+    if not isinstance(answer, str):
+        return PuzzleResult(day, part, None, wall_time, f'solution output is of invalid type: {type(answer)}',
+                            profile_report=profile_report)
+    return PuzzleResult(day, part, answer, wall_time, profile_report=profile_report)
+
+
+def run_all(days: Optional[List[int]] = None, max_workers: Optional[int] = None,
+            use_cache: bool = True, profile: Optional[ProfileMode] = None) -> List[PuzzleResult]:
+    # imported here to keep single puzzle runs from paying for multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
 
-    print(f'Solving {puzzle_id} puzzle')
-    solution_output = solution_function(puzzle_input)
+    puzzles = find_puzzles(days)
+    # profiling needs the solution to actually run
+    cache = AnswerCache() if use_cache and profile is None else None
+
+    # every input file is read once and shared by all parts that use it
+    inputs: Dict[Path, str] = {}
+    puzzle_inputs: Dict[Tuple[int, int], Path] = {}
+    cache_keys: Dict[Tuple[int, int], str] = {}
+    results: List[PuzzleResult] = []
+    for day, part in puzzles:
+        try:
+            input_file = find_input_file(day, part)
+        except RuntimeError as e:
+            results.append(PuzzleResult(day, part, None, 0.0, str(e)))
+            continue
+        if input_file not in inputs:
+            inputs[input_file] = load_input_from_file(input_file)
+        if cache is not None:
+            s_time = time.perf_counter()
+            cache_keys[(day, part)] = cache.make_key(day, part, inputs[input_file])
+            answer = cache.get(cache_keys[(day, part)])
+            if answer is not None:
+                results.append(PuzzleResult(day, part, answer, time.perf_counter() - s_time, cached=True))
+                continue
+        puzzle_inputs[(day, part)] = input_file
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(solve_puzzle, day, part, inputs[input_file], profile)
+                   for (day, part), input_file in puzzle_inputs.items()]
+        for f in futures:
+            res = f.result()
+            if cache is not None and res.error is None:
+                cache.put(cache_keys[(res.day, res.part)], res.answer)
+            results.append(res)
+    if cache is not None:
+        cache.save_if_dirty()
+    results.sort(key=lambda r: (r.day, r.part))
+    return results
+
+
+def print_results(results: List[PuzzleResult]):
+    for r in results:
+        if r.error is not None:
+            outcome = f'Error: {r.error}'
+        elif '\n' in r.answer:
+            outcome = '\n' + r.answer
+        else:
+            outcome = r.answer
+        print(f'{r.puzzle_id:>6} {r.wall_time:9.3f}s{"*" if r.cached else " "} {outcome}')
+        if r.profile_report is not None:
+            print(r.profile_report)
+
+
+def run_puzzle(day: int, part: int, use_cache: bool = True, profile: Optional[ProfileMode] = None):
+    puzzle_id = f'd{day}p{part}'
+    puzzle_input = load_input_from_file(find_input_file(day, part))
+
+    # a cache hit only costs hashing the input and the solution source, the module is never imported
+    cache, cache_key, solution_output = None, None, None
+    if use_cache and profile is None:
+        cache = AnswerCache()
+        cache_key = cache.make_key(day, part, puzzle_input)
+        solution_output = cache.get(cache_key)
+    if solution_output is not None:
+        print(f'Using cached {puzzle_id} solution')
+    else:
+        print(f'Solving {puzzle_id} puzzle')
+        if profile is None:
+            solution_output = get_solution(day, part)(puzzle_input)
+        else:
+            solution_output, profile_report = profile_call(get_solution(day, part), puzzle_input, puzzle_id, profile)
+            print(profile_report)
+        if cache is not None and isinstance(solution_output, str):
+            cache.put(cache_key, solution_output)
+    if cache is not None:
+        cache.save_if_dirty()
     if isinstance(solution_output, str):
         print('Done, printing solution')
         print('=======================')
@@ -31,4 +148,19 @@ def run_puzzle(day: int, part: int):
 
 
 if __name__ == '__main__':
-    run_puzzle(day=1, part=2)
+    parser = ArgumentParser(description='Solve a single puzzle, or every puzzle in parallel if no day is given')
+    parser.add_argument('day', type=int, nargs='?')
+    parser.add_argument('part', type=int, nargs='?')
+    parser.add_argument('--workers', type=int, default=None, help='size of the process pool used for batch runs')
+    parser.add_argument('--no-cache', action='store_true', help='ignore and do not update the answer cache')
+    parser.add_argument('--profile', choices=[m.value for m in ProfileMode], default=None,
+                        help='run solutions under cProfile or tracemalloc (implies --no-cache)')
+    args = parser.parse_args()
+    args.profile = None if args.profile is None else ProfileMode(args.profile)
+    if args.day is None:
+        print_results(run_all(max_workers=args.workers, use_cache=not args.no_cache, profile=args.profile))
+    elif args.part is None:
+        print_results(run_all(days=[args.day], max_workers=args.workers, use_cache=not args.no_cache,
+                              profile=args.profile))
+    else:
+        run_puzzle(day=args.day, part=args.part, use_cache=not args.no_cache, profile=args.profile)
@@ -0,0 +1,93 @@
+import cProfile
+import io
+import pstats
+import threading
+import tracemalloc
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+
+class ProfileMode(Enum):
+    CPROFILE = 'cprofile'
+    TRACEMALLOC = 'tracemalloc'
+
+
+def run_cprofile(func: Callable[[str], Any], arg: str, stats_file: Path, top_n: int) -> Tuple[Any, str]:
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, arg)
+    stats_file.parent.mkdir(parents=True, exist_ok=True)
+    profiler.dump_stats(stats_file)
+
+    report = io.StringIO()
+    report.write(f'pstats written to {stats_file}\n')
+    pstats.Stats(profiler, stream=report).strip_dirs().sort_stats(pstats.SortKey.TIME).print_stats(top_n)
+    return result, report.getvalue()
+
+
+class PeakSampler(threading.Thread):
+    # snapshots taken after the call only show what is still alive, so this thread keeps the snapshot taken at the
+    # highest traced memory it saw while the call was running
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.peak_size = 0
+        self.peak_snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            current, _ = tracemalloc.get_traced_memory()
+            # a new snapshot only pays off once memory has grown noticeably past the last one
+            if current > self.peak_size * 1.05:
+                self.peak_size = current
+                self.peak_snapshot = tracemalloc.take_snapshot()
+
+
+def format_statistics(snapshot: tracemalloc.Snapshot, top_n: int) -> List[str]:
+    # leave out the profiler itself and the sampling thread
+    snapshot = snapshot.filter_traces([tracemalloc.Filter(False, f) for f in
+                                       (tracemalloc.__file__, threading.__file__, __file__, '*/_weakrefset.py')])
+    lines = []
+    for stat in snapshot.statistics('lineno')[:top_n]:
+        frame = stat.traceback[0]
+        lines.append(f'  {frame.filename}:{frame.lineno}: {stat.size / 1024:.1f} KiB in {stat.count} blocks')
+    return lines
+
+
+def run_tracemalloc(func: Callable[[str], Any], arg: str, top_n: int,
+                    sample_interval: float = 0.01) -> Tuple[Any, str]:
+    was_tracing = tracemalloc.is_tracing()
+    if was_tracing:
+        tracemalloc.clear_traces()
+    else:
+        tracemalloc.start()
+    sampler = PeakSampler(sample_interval)
+    sampler.start()
+    try:
+        result = func(arg)
+    finally:
+        sampler.stopped.set()
+        sampler.join()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not was_tracing:
+            tracemalloc.stop()
+
+    lines = [f'peak memory: {peak / 1024:.1f} KiB, still allocated: {current / 1024:.1f} KiB']
+    if sampler.peak_snapshot is not None:
+        lines.append(f'top {top_n} allocation sites near peak (sampled at {sampler.peak_size / 1024:.1f} KiB):')
+        lines.extend(format_statistics(sampler.peak_snapshot, top_n))
+    else:
+        lines.append(f'no sample near peak, the call returned within {sample_interval * 1000:.0f} ms')
+    lines.append(f'top {top_n} allocation sites live at return:')
+    lines.extend(format_statistics(snapshot, top_n))
+    return result, '\n'.join(lines)
+
+
+def profile_call(func: Callable[[str], Any], arg: str, puzzle_id: str, mode: Union[ProfileMode, str],
+                 output_dir: Path = Path('profiles'), top_n: int = 20) -> Tuple[Any, str]:
+    mode = ProfileMode(mode)
+    if mode is ProfileMode.CPROFILE:
+        return run_cprofile(func, arg, stats_file=Path(output_dir, f'{puzzle_id}.pstats'), top_n=top_n)
+    return run_tracemalloc(func, arg, top_n=top_n)
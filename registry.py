@@ -0,0 +1,64 @@
+import re
+import time
+from importlib import import_module
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from common import PuzzleSolution
+
+
+solution_def_regex = re.compile(r'^def d(\d+)p(\d+)_solution\(', re.MULTILINE)
+
+
+class SolutionRegistry:
+    def __init__(self, solutions_dir: Union[Path, str] = Path('solutions'), package: str = 'solutions'):
+        self.solutions_dir = Path(solutions_dir)
+        self.package = package
+        self.import_times: Dict[str, float] = {}
+        self._index: Optional[Dict[Tuple[int, int], str]] = None
+        self._solutions: Dict[Tuple[int, int], PuzzleSolution] = {}
+
+    @property
+    def index(self) -> Dict[Tuple[int, int], str]:
+        # (day, part) -> module name, found by scanning the sources instead of importing them
+        if self._index is None:
+            self._index = {}
+            for module_file in self.solutions_dir.glob('day*.py'):
+                source = module_file.read_text(encoding='utf8')
+                for match in solution_def_regex.finditer(source):
+                    self._index[(int(match[1]), int(match[2]))] = module_file.stem
+        return self._index
+
+    def puzzles(self, days: Optional[List[int]] = None) -> List[Tuple[int, int]]:
+        return sorted(p for p in self.index if days is None or p[0] in days)
+
+    def get(self, day: int, part: int) -> PuzzleSolution:
+        solution = self._solutions.get((day, part))
+        if solution is not None:
+            return solution
+        module_name = self.index.get((day, part))
+        if module_name is None:
+            raise RuntimeError(f'd{day}p{part} has no solution')
+        solution = getattr(self.load_module(module_name), f'd{day}p{part}_solution')
+        self._solutions[(day, part)] = solution
+        return solution
+
+    def load_module(self, module_name: str):
+        s_time = time.perf_counter()
+        module = import_module(f'{self.package}.{module_name}')
+        if module_name not in self.import_times:
+            self.import_times[module_name] = time.perf_counter() - s_time
+        return module
+
+    def import_all(self) -> Dict[str, float]:
+        for module_name in sorted(set(self.index.values()), key=lambda m: int(m[3:])):
+            self.load_module(module_name)
+        return self.import_times
+
+
+registry = SolutionRegistry()
+
+
+if __name__ == '__main__':
+    for name, import_time in registry.import_all().items():
+        print(f'{name:>6} {import_time * 1000:8.3f}ms')
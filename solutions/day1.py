@@ -1,31 +1,93 @@
+import heapq
 import itertools
-from typing import List
+from pathlib import Path
+from typing import Iterable, Iterator, List, Union
 
-from common import line_iterator
+from common import ByteBuffer, chunked_line_iterator, extract_int_groups, iter_chunks, iter_lines, optional_numpy, \
+    InputData
 
 
-def parse_elves(input_str: str) -> List[int]:
-    elves: List[int] = []
+def elf_array(input_data: InputData):
+    # None when a line is not a plain number, the line parser then reports it
+    np = optional_numpy()
+    groups = extract_int_groups(input_data)
+    if groups is None:
+        return None
+    calories, elf_ids = groups
+    if len(calories) == 0:
+        return np.zeros(0, dtype=np.int64)
+    elves = np.zeros(elf_ids[-1] + 1, dtype=np.int64)
+    first_items = np.flatnonzero(np.diff(elf_ids, prepend=-1))
+    elves[elf_ids[first_items]] = np.add.reduceat(calories, first_items)
+    return elves
+
+
+def iter_elf_totals(lines: Iterable[Union[str, bytes]]) -> Iterator[int]:
     current_elf = 0
-    for line in itertools.chain(line_iterator(input_str), ['']):
+    for line in itertools.chain(lines, ['']):
         line = line.strip()
         if line:
             current_elf += int(line)
             continue
-        elves.append(current_elf)
+        yield current_elf
         current_elf = 0
-    return elves
 
 
-def d1p1_solution(input_str: str) -> str:
-    return str(max(parse_elves(input_str)))
+def parse_elves(input_data: InputData) -> List[int]:
+    if optional_numpy(len(input_data)) is not None:
+        elves = elf_array(input_data)
+        if elves is not None:
+            return elves.tolist()
+    return list(iter_elf_totals(iter_lines(input_data)))
+
+
+def top_totals(totals: Iterable[int], k: int) -> List[int]:
+    # min-heap of the best k seen so far, memory stays O(k) no matter how many elves there are
+    if k < 1:
+        raise RuntimeError(f'k must be at least 1, got {k}')
+    heap: List[int] = []
+    for total in totals:
+        if len(heap) < k:
+            heapq.heappush(heap, total)
+        elif total > heap[0]:
+            heapq.heapreplace(heap, total)
+    return sorted(heap, reverse=True)
+
+
+def top_totals_array(elves, k: int) -> List[int]:
+    np = optional_numpy()
+    if k < 1:
+        raise RuntimeError(f'k must be at least 1, got {k}')
+    if len(elves) > k:
+        elves = np.partition(elves, len(elves) - k)[-k:]
+    return sorted(elves.tolist(), reverse=True)
+
+
+def top_elves(input_data: InputData, k: int = 3) -> List[int]:
+    if optional_numpy(len(input_data)) is not None:
+        elves = elf_array(input_data)
+        if elves is not None:
+            return top_totals_array(elves, k)
+    return top_totals(iter_elf_totals(iter_lines(input_data)), k)
+
+
+def top_elves_streamed(source: Union[Path, str, ByteBuffer], k: int = 3, chunk_size: int = 1 << 20) -> List[int]:
+    # reads a file or buffer chunk by chunk, never holding more than one chunk and k totals
+    return top_totals(iter_elf_totals(chunked_line_iterator(iter_chunks(source, chunk_size))), k)
+
+
+def d1p1_solution(input_data: InputData) -> str:
+    elves = top_elves(input_data, k=1)
+    if not elves:
+        raise RuntimeError('Invalid input')
+    return str(elves[0])
 
 
-def d1p2_solution(input_str: str) -> str:
-    elves = parse_elves(input_str)
+def d1p2_solution(input_data: InputData) -> str:
+    elves = top_elves(input_data, k=3)
     if len(elves) < 3:
         raise RuntimeError('Invalid input')
-    return str(sum(sorted(elves, reverse=True)[:3]))
+    return str(sum(elves))
 
 
 if __name__ == '__main__':
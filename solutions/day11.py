@@ -1,25 +1,25 @@
 import math
 import re
-import time
 from collections import deque
-from itertools import chain
-from typing import Callable, Optional, Deque, List, Any, Dict
+from typing import Callable, Optional, Deque, List
 
-from common import line_iterator
+from common import iter_line_matches
 
 
-monkey_line_regex = re.compile(r'Monkey (\d+):')
+# the block regex only checks the layout, every field is then parsed with its own regex below
+monkey_regex = re.compile(
+    r'^Monkey (\d+):\r?\n'
+    r'  Starting items:(.*?)\r?\n'
+    r'  Operation:(.*?)\r?\n'
+    r'  Test:(.*?)\r?\n'
+    r'    If true:(.*?)\r?\n'
+    r'    If false:(.*?)\r?$', re.MULTILINE)
 
+items_regex = re.compile(r'(\d+(?:, \d+)*)?')
 operation_regex = re.compile(r'new = (old|\d+) ([+\-*]) (old|\d+)')
 test_regex = re.compile(r'divisible by (\d+)')
 throw_regex = re.compile(r'throw to monkey (\d+)')
-
-indent = '  '
-k_starting_items = 'Starting items:'
-k_operation = 'Operation:'
-k_test = 'Test:'
-k_if_true = indent + 'If true:'
-k_if_false = indent + 'If false:'
+field_regexes = (items_regex, operation_regex, test_regex, throw_regex, throw_regex)
 
 
 class Monkey:
@@ -31,28 +31,6 @@ class Monkey:
 
         self.inspection_count = 0
 
-    @staticmethod
-    def parse_line(line: str, d: Dict[str, Any]):
-        if line.startswith(k_starting_items):
-            d['si'] = [int(wls) for wls in line[len(k_starting_items):].strip().split(', ')]
-        elif line.startswith(k_operation):
-            d['op'] = Operation.from_str(line[len(k_operation):])
-        elif line.startswith(k_test):
-            d['ts'] = Test.from_str(line[len(k_test):])
-        elif line.startswith(k_if_true):
-            d['it'] = int(throw_regex.match(line[len(k_if_true):].strip())[1])
-        elif line.startswith(k_if_false):
-            d['if'] = int(throw_regex.match(line[len(k_if_false):].strip())[1])
-        else:
-            raise RuntimeError(f'Invalid monkey entry: {line}')
-
-    @classmethod
-    def from_lines(cls, lines: List[str]):
-        d = {}
-        for line in lines:
-            cls.parse_line(line, d)
-        return cls(starting_items=d['si'], operation=d['op'], test=d['ts'], if_true=d['it'], if_false=d['if'])
-
     def play_turn(self, monkeys: List['Monkey'], relief_factor: int, lcm: Optional[int]):
         while self.items:
             worry_level = self.items.popleft()
@@ -119,24 +97,30 @@ def play_round(monkeys: List[Monkey], relief_factor: int, lcm: Optional[int] = N
 
 def read_input(input_str: str) -> List[Monkey]:
     monkeys: List[Monkey] = []
-    current_monkey_lines: Optional[List[str]] = None
-    for line in chain(line_iterator(input_str), ['']):
-        if not line.strip():
-            m = Monkey.from_lines(current_monkey_lines)
-            m_id = len(monkeys)
-            if m_id in m.targets.values():
-                raise RuntimeError(f'Monkey {m_id} targets itself')
-            monkeys.append(m)
-            current_monkey_lines = None
-        elif current_monkey_lines is None:
-            match = monkey_line_regex.match(line)
-            if int(match[1]) != len(monkeys):
-                raise RuntimeError(f'Out of order monkeys: expected {len(monkeys)}, got "{match[1]}"')
-            current_monkey_lines = []
-        elif line.startswith(indent):
-            current_monkey_lines.append(line[len(indent):])
-        else:
-            raise RuntimeError(f'Unexpected line: "{line}"')
+    line_num, counted_to, block_end = 1, 0, 0
+    for match in iter_line_matches(monkey_regex, input_str):
+        line_num += input_str.count('\n', counted_to, match.start())
+        counted_to = match.start()
+        # blocks have to be separated by a blank line
+        if monkeys and input_str.count('\n', block_end, match.start()) < 2:
+            raise RuntimeError(f'Invalid input on line {line_num}: expected a blank line before '
+                               f'"{match[0].splitlines()[0]}"')
+        block_end = match.end()
+        m_id = match[1]
+        if int(m_id) != len(monkeys):
+            raise RuntimeError(f'Out of order monkeys: expected {len(monkeys)}, got "{m_id}"')
+        fields = [f.strip() for f in match.groups()[1:]]
+        for offset, (regex, field) in enumerate(zip(field_regexes, fields), start=1):
+            if regex.fullmatch(field) is None:
+                bad_line = match[0].splitlines()[offset]
+                raise RuntimeError(f'Invalid input on line {line_num + offset}: "{bad_line}"')
+        items, operation, test, if_true, if_false = fields
+        m = Monkey(starting_items=[int(wl) for wl in items.split(', ')] if items else [],
+                   operation=Operation.from_str(operation), test=Test.from_str(test),
+                   if_true=int(throw_regex.fullmatch(if_true)[1]), if_false=int(throw_regex.fullmatch(if_false)[1]))
+        if len(monkeys) in m.targets.values():
+            raise RuntimeError(f'Monkey {len(monkeys)} targets itself')
+        monkeys.append(m)
     return monkeys
 
 
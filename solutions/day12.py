@@ -1,17 +1,21 @@
-from collections import deque
-from typing import List, Tuple, NamedTuple, Optional, Dict, Deque, Iterator
+from typing import List, Tuple, NamedTuple, Optional, Iterable, Iterator
 
-from common import line_iterator, Direction, Pos
+from common import Direction, Graph, Grid2D, Pos, bfs, reconstruct_path
+
+
+# maps 'a'-'z' to heights 0-25
+height_values = bytes.maketrans(bytes(range(97, 123)), bytes(range(26)))
 
 
 class HeightMap:
-    def __init__(self, grid: List[List[int]], width: int, height: int):
+    def __init__(self, grid: Grid2D):
         self.grid = grid
-        self.width = width
-        self.height = height
+        self.width = grid.width
+        self.height = grid.height
+        self._graph: Optional[Graph] = None
 
     def get_height(self, pos: Pos) -> int:
-        return self.grid[pos.y][pos.x]
+        return self.grid.cells[pos.y * self.width + pos.x]
 
     def in_bounds(self, pos: Pos) -> bool:
         return 0 <= pos.x < self.width and 0 <= pos.y < self.height
@@ -21,14 +25,22 @@ class HeightMap:
         return self.in_bounds(to_pos) and self.get_height(to_pos) <= self.get_height(from_pos) + 1
 
     def scan_all_positions(self) -> Iterator[Pos]:
-        for y in range(self.height):
-            for x in range(self.width):
-                yield Pos(x, y)
+        for i in range(len(self.grid.cells)):
+            yield self.grid.pos_of(i)
+
+    @property
+    def graph(self) -> Graph:
+        # nodes are flat grid indices, an edge exists wherever the climb is at most one
+        if self._graph is None:
+            grid, cells = self.grid, self.grid.cells
+            self._graph = Graph.from_adjacency(
+                [n for n in grid.neighbors(i) if cells[n] <= cells[i] + 1] for i in range(len(cells)))
+        return self._graph
 
 
 class PathNode(NamedTuple):
     step_num: int
-    pos: Pos
+    pos: int    # flat grid index
     step_dir: Optional[Direction]
 
 
@@ -40,60 +52,44 @@ class Path:
     def last_step(self):
         return self.nodes[-1]
 
-    def step_in(self, direction: Direction) -> 'Path':
-        next_step = PathNode(self.last_step.step_num + 1, self.last_step.pos + direction, direction)
-        return Path(self.nodes + [next_step])
+    @classmethod
+    def from_indices(cls, grid: Grid2D, indices: List[int]) -> 'Path':
+        # directions come from the positions, flat offsets of Up and Left are the same on a one column grid
+        nodes = [PathNode(step_num=0, pos=indices[0], step_dir=None)]
+        for step_num, (prev, pos) in enumerate(zip(indices, indices[1:]), start=1):
+            step_dir = Direction(grid.pos_of(pos) - grid.pos_of(prev))
+            nodes.append(PathNode(step_num=step_num, pos=pos, step_dir=step_dir))
+        return cls(nodes)
+
+
+def solve_from(height_map: HeightMap, starts: Iterable[Pos], end_pos: Pos) -> Optional[Path]:
+    # multi-source bfs, the path is only rebuilt from parent pointers once the end is reached
+    grid = height_map.grid
+    end = grid.index(end_pos.x, end_pos.y)
+    sources = [grid.index(s.x, s.y) for s in starts]
+    distance, parent = bfs(height_map.graph, sources, target=end)
+    if distance[end] <= 0:
+        return None
+    return Path.from_indices(grid, reconstruct_path(parent, end))
 
 
 def solve(height_map: HeightMap, start_pos: Pos, end_pos: Pos) -> Optional[Path]:
-    # this algorithm can be optimized to significantly reduce memory usage
-    start_path = Path([PathNode(step_num=0, pos=start_pos, step_dir=None)])
-    locations: Dict[Pos, Path] = {start_pos: start_path}
-    last_steps: Deque[Path] = deque((start_path,))
-    while last_steps:
-        new_steps: Deque[Path] = deque()
-        while last_steps:
-            path = last_steps.popleft()
-            path_pos = path.last_step.pos
-            for d in Direction:
-                if not height_map.can_move(path_pos, d):
-                    continue
-                if path_pos + d not in locations:
-                    new_path = path.step_in(d)
-                    if new_path.last_step.pos == end_pos:
-                        return new_path
-                    locations[new_path.last_step.pos] = new_path
-                    new_steps.append(new_path)
-        last_steps = new_steps
-    return None
+    return solve_from(height_map, (start_pos,), end_pos)
 
 
 def read_input(input_str: str) -> Tuple[HeightMap, Pos, Pos]:
-    start_pos = None
-    end_pos = None
-    width = None
-    grid: List[List[int]] = []
-    for y, line in enumerate(line_iterator(input_str)):
-        if width is None:
-            width = len(line)
-        elif len(line) != width:
-            raise RuntimeError('Inconsistent map width')
-        if 'S' in line:
-            start_pos = Pos(line.index('S'), y)
-            line = line.replace('S', 'a')
-        if 'E' in line:
-            end_pos = Pos(line.index('E'), y)
-            line = line.replace('E', 'z')
-        row = []
-        for c in line:
-            h = ord(c) - 97
-            if not 0 <= h <= 25:
-                raise RuntimeError(f'Invalid height: "{c}" in line {y + 1}')
-            row.append(h)
-        grid.append(row)
-    if start_pos is None or end_pos is None:
+    grid = Grid2D.from_text(input_str)
+    start_index = grid.cells.find(b'S')
+    end_index = grid.cells.find(b'E')
+    if start_index < 0 or end_index < 0:
         raise RuntimeError('Missing start or end position')
-    return HeightMap(grid=grid, width=width, height=len(grid)), start_pos, end_pos
+    grid.cells[start_index] = ord('a')
+    grid.cells[end_index] = ord('z')
+    grid.cells = grid.cells.translate(height_values)
+    if max(grid.cells) > 25:
+        i = next(i for i, h in enumerate(grid.cells) if h > 25)
+        raise RuntimeError(f'Invalid height: "{chr(grid.cells[i])}" in line {i // grid.width + 1}')
+    return HeightMap(grid=grid), grid.pos_of(start_index), grid.pos_of(end_index)
 
 
 def d12p1_solution(input_str: str) -> str:
@@ -105,15 +101,10 @@ def d12p1_solution(input_str: str) -> str:
 
 
 def d12p2_solution(input_str: str) -> str:
-    # this could be optimised by running pathfinder backwards and treating any height=0 as solution
     height_map, _, end_pos = read_input(input_str)
     lowest_elevations = [s for s in height_map.scan_all_positions() if height_map.get_height(s) == 0]
-    best_trail: Optional[Path] = None
-    for start in lowest_elevations:
-        solution = solve(height_map=height_map, start_pos=start, end_pos=end_pos)
-        if solution is not None:
-            if best_trail is None or solution.last_step.step_num < best_trail.last_step.step_num:
-                best_trail = solution
+    # every lowest point is a bfs source at once, the first to reach the end is the shortest trail
+    best_trail = solve_from(height_map=height_map, starts=lowest_elevations, end_pos=end_pos)
     if best_trail is None:
         raise RuntimeError('No trails are possible')
     return str(best_trail.last_step.step_num)
@@ -1,8 +1,8 @@
 from enum import Enum
 from itertools import count
-from typing import List, Tuple, Iterator
+from typing import List, Tuple
 
-from common import line_iterator, Pos, Direction
+from common import line_iterator, Grid2D, Pos
 
 
 class Tile(Enum):
@@ -24,20 +24,24 @@ class Grid:
         self.height = height
         self.offset_x = offset_x
         self.offset_y = offset_y
-        self.grid: List[List[Tile]] = [[Tile.AIR for _ in range(width)] for _ in range(height)]
+        # one byte per tile, non-zero for solid tiles
+        self.grid = Grid2D(width=width, height=height, fill=Tile.AIR.value)
 
     def get_tile(self, pos: Pos) -> Tile:
-        return self.grid[pos.y - self.offset_y][pos.x - self.offset_x]
+        return Tile(bool(self.grid.cells[(pos.y - self.offset_y) * self.width + pos.x - self.offset_x]))
 
     def set_tile(self, pos: Pos, tile: Tile):
-        self.grid[pos.y - self.offset_y][pos.x - self.offset_x] = tile
+        self.grid.cells[(pos.y - self.offset_y) * self.width + pos.x - self.offset_x] = tile.value
+
+    def is_solid(self, pos: Pos) -> bool:
+        return self.grid.cells[(pos.y - self.offset_y) * self.width + pos.x - self.offset_x] != 0
 
     def is_in_bounds(self, pos: Pos) -> bool:
         return self.offset_x <= pos.x < self.offset_x + self.width and\
             self.offset_y <= pos.y < self.offset_y + self.height
 
     def can_place_sand(self, pos: Pos) -> bool:
-        return self.is_in_bounds(pos) and not self.get_tile(pos).solid
+        return self.is_in_bounds(pos) and not self.is_solid(pos)
 
     def draw_rock(self, from_pos: Pos, to_pos: Pos):
         if from_pos.y == to_pos.y:
@@ -52,31 +56,36 @@ class Grid:
             raise RuntimeError('Diagonal lines are not supported')
 
     def drop_sand(self, sand_pos: Pos) -> Tuple[Pos, bool]:
+        # steps through flat grid indices instead of allocating a Pos for every fall option
+        cells, w = self.grid.cells, self.width
+        x, y = sand_pos.x - self.offset_x, sand_pos.y - self.offset_y
+        i = self.grid.index(x, y)
         while True:
-            rest = True
-            for c_pos in sand_fall_options(sand_pos):
-                if not self.is_in_bounds(c_pos):
-                    return c_pos, False
-                if not self.get_tile(c_pos).solid:
-                    sand_pos = c_pos
-                    rest = False
-                    break
-            if rest:
-                self.set_tile(sand_pos, Tile.SAND)
-                return sand_pos, True
+            below = i + w
+            if below >= len(cells):
+                return Pos(x + self.offset_x, y + self.offset_y + 1), False
+            if not cells[below]:
+                i = below
+            elif x == 0:
+                return Pos(self.offset_x - 1, y + self.offset_y + 1), False
+            elif not cells[below - 1]:
+                i = below - 1
+                x -= 1
+            elif x == w - 1:
+                return Pos(self.offset_x + w, y + self.offset_y + 1), False
+            elif not cells[below + 1]:
+                i = below + 1
+                x += 1
+            else:
+                cells[i] = Tile.SAND.value
+                return Pos(x + self.offset_x, y + self.offset_y), True
+            y += 1
 
 
 def range_between(num1: int, num2: int) -> range:
     return range(min(num1, num2), max(num1, num2) + 1, 1)
 
 
-def sand_fall_options(current_pos: Pos) -> Iterator[Pos]:
-    current_pos += Direction.Down
-    yield current_pos
-    yield current_pos + Direction.Left
-    yield current_pos + Direction.Right
-
-
 def read_input(input_str: str, start_point: Pos, prt2: bool) -> Grid:
     line_def_ls: List[List[Pos]] = []
     all_points: List[Pos] = [start_point]
@@ -1,12 +1,14 @@
 import re
-import time
 from collections import deque
 from typing import List, Optional, Set, Deque, Iterator
 
-from common import line_iterator, Pos
+from common import extract_line_records, iter_line_matches, optional_numpy, Pos
 
 
-line_regex = re.compile(r'Sensor at x=(-?\d+), y=(-?\d+): closest beacon is at x=(-?\d+), y=(-?\d+)')
+line_regex = re.compile(r'^Sensor at x=(-?\d+), y=(-?\d+): closest beacon is at x=(-?\d+), y=(-?\d+)\r?$',
+                        re.MULTILINE)
+# the same line shape for extract_line_records
+line_template = (b'Sensor at x=', b', y=', b': closest beacon is at x=', b', y=', b'')
 
 
 class Range:
@@ -82,9 +84,12 @@ def scan_row(sensors: List[Sensor], row: int, scan_range: Optional[Range] = None
 
 
 def read_input(input_str: str) -> List[Sensor]:
+    records = extract_line_records(input_str, line_template) if optional_numpy(len(input_str)) is not None else None
+    if records is not None:
+        return [Sensor(sensor_pos=Pos(sx, sy), beacon_pos=Pos(bx, by)) for sx, sy, bx, by in records.tolist()]
+    # small inputs and anything the numpy check rejects, line_regex reports the malformed line
     sensor_list: List[Sensor] = []
-    for line in line_iterator(input_str):
-        match = line_regex.match(line)
+    for match in iter_line_matches(line_regex, input_str):
         s = Sensor(sensor_pos=Pos(int(match[1]), int(match[2])), beacon_pos=Pos(int(match[3]), int(match[4])))
         sensor_list.append(s)
     return sensor_list
@@ -119,7 +124,6 @@ def d15p2_solution(input_str: str) -> str:
     sensors.sort(key=lambda s: s.pos_x)
 
     first_empty_pos = None
-    s_time = time.time()
     for y in y_range:
         ranges = scan_row(sensors, y, x_range)
         if sum(len(r) for r in ranges) < len(x_range):
@@ -133,7 +137,6 @@ def d15p2_solution(input_str: str) -> str:
                 raise RuntimeError()
             first_empty_pos = Pos(x=x, y=y)
             break
-    print(f'scan completed in {time.time() - s_time:0.3f} seconds')
 
     if first_empty_pos is None:
         raise RuntimeError('No unscanned areas found in given ranges')
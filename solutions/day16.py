@@ -1,12 +1,13 @@
 import re
 from collections import deque
 from itertools import chain
-from typing import List, Tuple, Dict, Deque, Set, Optional, Iterable
+from typing import List, Tuple, Dict, Deque, Set, Optional, Iterable, NamedTuple
 
-from common import line_iterator
+from common import Graph, bfs, iter_line_matches, reconstruct_path
 
 
-valve_regex = re.compile(r'Valve (\w+) has flow rate=(\d+); tunnels? leads? to valves? (\w+(?:, \w+)*)')
+valve_regex = re.compile(r'^Valve (\w+) has flow rate=(\d+); tunnels? leads? to valves? (\w+(?:, \w+)*)\r?$',
+                         re.MULTILINE)
 
 
 class Valve:
@@ -20,8 +21,10 @@ class Valve:
     def set_tunnels(self, all_valves: Dict[str, 'Valve'], valve_names: List[str]):
         self.tunnels = [all_valves[vn] for vn in valve_names]
 
-    def calculate_paths(self, all_valves: Dict[str, 'Valve'], destinations: Set[str]):
-        self.shortest_paths = find_paths(valves=all_valves, from_valve=self, destinations=destinations)
+    def calculate_paths(self, all_valves: Dict[str, 'Valve'], destinations: Set[str],
+                        tunnels: Optional['TunnelGraph'] = None):
+        self.shortest_paths = find_paths(valves=all_valves, from_valve=self, destinations=destinations,
+                                         tunnels=tunnels)
 
 
 class State:
@@ -112,26 +115,30 @@ class State:
         return scores
 
 
-def find_paths(valves: Dict[str, Valve], from_valve: Valve, destinations: Set[str]) -> Dict[str, List[str]]:
+class TunnelGraph(NamedTuple):
+    graph: Graph
+    names: List[str]
+    indices: Dict[str, int]
+
+    @classmethod
+    def from_valves(cls, valves: Dict[str, Valve]) -> 'TunnelGraph':
+        names = list(valves)
+        indices = {n: i for i, n in enumerate(names)}
+        graph = Graph.from_adjacency([indices[t.name] for t in valves[n].tunnels] for n in names)
+        return cls(graph=graph, names=names, indices=indices)
+
+
+def find_paths(valves: Dict[str, Valve], from_valve: Valve, destinations: Set[str],
+               tunnels: Optional[TunnelGraph] = None) -> Dict[str, List[str]]:
+    if tunnels is None:
+        tunnels = TunnelGraph.from_valves(valves)
+    distance, parent = bfs(tunnels.graph, (tunnels.indices[from_valve.name],))
     solutions: Dict[str, List[str]] = {}
-    reached: Set[str] = {from_valve.name}
-    last_steps: Deque[Deque[str]] = deque((deque(),))
-    while last_steps and destinations:
-        new_steps: Deque[Deque[str]] = deque()
-        while last_steps and destinations:
-            path = last_steps.popleft()
-            current_valve = valves[path[-1]] if path else from_valve
-            for new_valve in current_valve.tunnels:
-                if new_valve.name in reached:
-                    continue
-                new_path = path.copy()
-                new_path.append(new_valve.name)
-                new_steps.append(new_path)
-                reached.add(new_valve.name)
-                if new_valve.name in destinations:
-                    destinations.remove(new_valve.name)
-                    solutions[new_valve.name] = list(new_path)
-        last_steps = new_steps
+    for name in destinations:
+        target = tunnels.indices[name]
+        if distance[target] > 0:
+            # the path leaves out the valve it starts from
+            solutions[name] = [tunnels.names[i] for i in reconstruct_path(parent, target)[1:]]
     return solutions
 
 
@@ -139,8 +146,7 @@ def read_input(input_str: str) -> Dict[str, Valve]:
     valves: Dict[str, Valve] = {}
     vl: List[Tuple[Valve, List[str]]] = []
 
-    for line in line_iterator(input_str):
-        match = valve_regex.match(line)
+    for match in iter_line_matches(valve_regex, input_str):
         v = Valve(name=match[1], flow_rate=int(match[2]))
         vl.append((v, list(map(str.strip, match[3].split(',')))))
         valves[v.name] = v
@@ -156,8 +162,10 @@ def d16p1_solution(input_str: str) -> str:
 
     valves = read_input(input_str)
     functional_valves = [v for v in valves.values() if v.flow_rate > 0]
+    tunnels = TunnelGraph.from_valves(valves)
     for valve in chain((valves['AA'],), functional_valves):
-        valve.calculate_paths(all_valves=valves, destinations={d.name for d in functional_valves if d != valve})
+        valve.calculate_paths(all_valves=valves, destinations={d.name for d in functional_valves if d != valve},
+                              tunnels=tunnels)
 
     states: Deque[State] = deque([State(valves=valves, current_location='AA')])
     results: List[State] = []
@@ -1,8 +1,8 @@
-import re
+from collections import Counter
 from enum import Enum
-from typing import List, Tuple, Iterator, Dict
+from typing import Tuple, Dict
 
-from common import line_iterator
+from common import as_str, byte_line_iterator, iter_lines, InputData
 
 
 class Shape(Enum):
@@ -29,7 +29,6 @@ for ys, rd in results.items():
         desired_outcomes[os][out] = ys
 
 # input-related constants
-line_regex = re.compile('^([ABC]) ([XYZ])$')
 opponent_codes = {'A': Shape.Rock, 'B': Shape.Paper, 'C': Shape.Scissors}
 your_codes = {'X': Shape.Rock, 'Y': Shape.Paper, 'Z': Shape.Scissors}
 result_codes = {'X': Outcome.Loss, 'Y': Outcome.Draw, 'Z': Outcome.Win}
@@ -40,41 +39,42 @@ def play_round(your_shape: Shape, opponent_shape: Shape) -> int:
     return your_shape.value + res.value
 
 
-def play_game(round_moves: List[Tuple[Shape, Shape]]) -> int:
-    # round_moves: [(your_move, opponent_move), ...]
-    return sum(play_round(your_sh, opp_sh) for your_sh, opp_sh in round_moves)
-
+# (part 1 score, part 2 score) of each of the nine valid lines
+line_scores: Dict[bytes, Tuple[int, int]] = {
+    f'{opp_code} {code}'.encode('utf8'): (play_round(your_codes[code], opp_shape),
+                                           play_round(desired_outcomes[opp_shape][result_codes[code]], opp_shape))
+    for opp_code, opp_shape in opponent_codes.items() for code in 'XYZ'
+}
 
-def iter_guide_lines(input_str: str) -> Iterator[Tuple[str, str]]:
-    for line in line_iterator(input_str):
-        match = line_regex.match(line)
-        if match is None:
-            raise RuntimeError('Invalid input')
-        yield match[1], match[2]
 
+def count_guide_lines(input_data: InputData) -> Counter:
+    # there are only nine valid lines, so counting them replaces parsing every round
+    # lines are counted as dict keys, so they have to be bytes and not bytearray slices
+    data = input_data.encode('utf8') if isinstance(input_data, str) else input_data
+    if isinstance(data, bytearray):
+        data = bytes(data)
+    counts = Counter(data.splitlines() if isinstance(data, bytes) else byte_line_iterator(data))
+    if not counts.keys() <= line_scores.keys():
+        # only the error path goes back to find where the invalid line is
+        for line_num, line in enumerate(iter_lines(data), start=1):
+            if line.rstrip(b'\r') not in line_scores:
+                raise RuntimeError(f'Invalid input on line {line_num}: "{as_str(line)}"')
+    return counts
 
-def d2p1_solution(input_str: str) -> str:
-    # read the guide (incorrectly)
-    guide: List[Tuple[Shape, Shape]] = []
-    for opp_code, your_code in iter_guide_lines(input_str):
-        guide.append((opponent_codes[opp_code], your_codes[your_code]))
 
-    # play game and return score
-    moves = [(ym, om) for om, ym in guide]
-    return str(play_game(moves))
+def score_guide(input_data: InputData, part: int) -> int:
+    counts = count_guide_lines(input_data)
+    return sum(line_scores[line][part - 1] * count for line, count in counts.items())
 
 
-def d2p2_solution(input_str: str) -> str:
-    # read the guide (correctly)
-    guide: List[Tuple[Shape, Outcome]] = []
-    for opp_code, res_code in iter_guide_lines(input_str):
-        guide.append((opponent_codes[opp_code], result_codes[res_code]))
+def d2p1_solution(input_data: InputData) -> str:
+    # the second column is read (incorrectly) as your shape
+    return str(score_guide(input_data, part=1))
 
-    # calculate our moves from desired outcomes
-    moves: List[Tuple[Shape, Shape]] = [(desired_outcomes[opp_sh][outcome], opp_sh) for opp_sh, outcome in guide]
 
-    # play game and return score
-    return str(play_game(moves))
+def d2p2_solution(input_data: InputData) -> str:
+    # the second column is read (correctly) as the desired outcome
+    return str(score_guide(input_data, part=2))
 
 
 if __name__ == '__main__':
@@ -1,6 +1,9 @@
-from typing import Tuple, Iterable, Set
+from typing import List, Set, Tuple
 
-from common import line_iterator
+from common import as_byte_array, iter_lines, optional_numpy, InputData
+
+
+item_letters = b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
 
 def get_priority(char: str) -> int:
@@ -12,32 +15,110 @@ def get_priority(char: str) -> int:
     raise RuntimeError('Invalid item character')
 
 
-def intersection(iterables: Tuple[Iterable, ...]) -> Set:
-    return set.intersection(*(set(it) for it in iterables))
-
-
-def d3p1_solution(input_str: str) -> str:
-    priority_sum = 0
-    for line in line_iterator(input_str):
-        if len(line) % 2 != 0:
-            raise RuntimeError('rucksack contains odd number of items')
-        lm = len(line) // 2
-        shared_item = intersection((line[:lm], line[lm:]))
-        if len(shared_item) != 1:
-            raise RuntimeError(f'Invalid input: line "{line}" shares {len(shared_item)} items between compartments')
-        priority_sum += get_priority(shared_item.pop())
-    return str(priority_sum)
-
-
-def d3p2_solution(input_str: str) -> str:
-    priority_sum = 0
-    for group in zip(*[line_iterator(input_str)] * 3):  # type: Tuple[str, str, str]
-        # iterate over 3 lines at once
-        shared_item = intersection(group)
-        if len(shared_item) != 1:
-            raise RuntimeError(f"Invalid input: group ({group}) has following shared items: {shared_item}")
-        priority_sum += get_priority(shared_item.pop())
-    return str(priority_sum)
+# item masks have bit_length equal to the priority, characters that are not items get a bit above all of them
+invalid_item = 1 << 53
+item_masks: List[int] = [invalid_item] * 256
+for _c in item_letters:
+    item_masks[_c] = 1 << (get_priority(chr(_c)) - 1)
+
+
+def mask_items(mask: int) -> Set[str]:
+    return {chr(c) for c in item_letters if mask & item_masks[c]}
+
+
+def rucksack_priorities(input_data: InputData, compartments: bool = True, badges: bool = True) -> Tuple[int, int]:
+    # both parts in one streaming pass: (sum of compartment items, sum of group badges)
+    # set intersection is a single C call, so only the shared items get turned into bits here
+    masks = item_masks.__getitem__
+    compartment_sum = badge_sum = 0
+    group: List[bytes] = []
+    for line_num, line in enumerate(iter_lines(input_data), start=1):
+        items = line.encode('utf8') if isinstance(line, str) else line
+        if compartments:
+            lm = len(items) // 2
+            if lm * 2 != len(items):
+                raise RuntimeError('rucksack contains odd number of items')
+            shared = sum(map(masks, set(items[:lm]).intersection(items[lm:])))
+            if not shared or shared & (shared - 1):
+                raise RuntimeError(f'Invalid input: line "{line}" shares {len(mask_items(shared))} items between '
+                                   f'compartments')
+            if shared >= invalid_item:
+                raise RuntimeError('Invalid item character')
+            compartment_sum += shared.bit_length()
+        if badges:
+            group.append(items)
+            if len(group) == 3:
+                group_mask = sum(map(masks, set(group[0]).intersection(group[1], group[2])))
+                if not group_mask or group_mask & (group_mask - 1):
+                    raise RuntimeError(f'Invalid input: group ending on line {line_num} has following shared items: '
+                                       f'{mask_items(group_mask)}')
+                if group_mask >= invalid_item:
+                    raise RuntimeError('Invalid item character')
+                badge_sum += group_mask.bit_length()
+                group = []
+    return compartment_sum, badge_sum
+
+
+def rucksack_priorities_numpy(input_data: InputData, compartments: bool = True,
+                              badges: bool = True) -> Tuple[int, int]:
+    # every mask is one bitwise_or.reduceat segment, invalid input is re-run in python for the error
+    np = optional_numpy()
+    buf = as_byte_array(input_data)
+    table = np.array(item_masks, dtype=np.uint64)
+    table[[10, 13]] = 0
+    newlines = np.flatnonzero(buf == 10)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.append(newlines, len(buf))
+    if starts[-1] == len(buf):
+        starts, ends = starts[:-1], ends[:-1]
+    if len(starts) == 0:
+        return 0, 0
+    item_bits = table[buf]
+
+    def single_items(masks) -> bool:
+        return bool(((masks != 0) & ((masks & (masks - np.uint64(1))) == 0)).all()) \
+            and not (masks >= np.uint64(invalid_item)).any()
+
+    def python_fallback() -> Tuple[int, int]:
+        return rucksack_priorities(input_data, compartments=compartments, badges=badges)
+
+    # powers of two are exact in float64, log2 + 1 is the priority
+    compartment_sum = badge_sum = 0
+    if compartments:
+        ends = ends - (buf[np.maximum(ends - 1, 0)] == 13)
+        lengths = ends - starts
+        if (lengths == 0).any() or (lengths % 2).any():
+            return python_fallback()
+        bounds = np.empty(len(starts) * 2, dtype=np.int64)
+        bounds[0::2], bounds[1::2] = starts, starts + lengths // 2
+        halves = np.bitwise_or.reduceat(item_bits, bounds)
+        shared = halves[0::2] & halves[1::2]
+        if not single_items(shared):
+            return python_fallback()
+        compartment_sum = int(np.log2(shared).sum()) + len(shared)
+    if badges:
+        # newlines have no bits, so each segment from one line start to the next is that rucksack
+        full = np.bitwise_or.reduceat(item_bits, starts)
+        grouped = len(full) // 3 * 3
+        badge_masks = full[0:grouped:3] & full[1:grouped:3] & full[2:grouped:3]
+        if not single_items(badge_masks):
+            return python_fallback()
+        badge_sum = int(np.log2(badge_masks).sum()) + len(badge_masks)
+    return compartment_sum, badge_sum
+
+
+def priorities(input_data: InputData, compartments: bool = True, badges: bool = True) -> Tuple[int, int]:
+    if optional_numpy(len(input_data)) is not None:
+        return rucksack_priorities_numpy(input_data, compartments=compartments, badges=badges)
+    return rucksack_priorities(input_data, compartments=compartments, badges=badges)
+
+
+def d3p1_solution(input_data: InputData) -> str:
+    return str(priorities(input_data, badges=False)[0])
+
+
+def d3p2_solution(input_data: InputData) -> str:
+    return str(priorities(input_data, compartments=False)[1])
 
 
 if __name__ == '__main__':
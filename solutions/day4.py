@@ -1,6 +1,7 @@
-from typing import Iterator
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, Tuple, Union
 
-from common import line_iterator
+from common import as_str, extract_line_records, iter_lines, optional_numpy, InputData
 
 
 class SectionGroup:
@@ -20,8 +21,8 @@ class SectionGroup:
             return self.from_section <= other.to_section
 
     @classmethod
-    def from_str(cls, s: str) -> 'SectionGroup':
-        ints = [int(i.strip()) for i in s.split('-', maxsplit=1)]
+    def from_str(cls, s: Union[str, bytes]) -> 'SectionGroup':
+        ints = [int(i.strip()) for i in s.split('-' if isinstance(s, str) else b'-', maxsplit=1)]
         return cls(from_section=ints[0], to_section=ints[1])
 
 
@@ -31,23 +32,82 @@ class ElfPair:
         self.second_elf = second_elf
 
 
-def iter_elf_pairs(input_str: str) -> Iterator[ElfPair]:
-    for line in line_iterator(input_str):
-        elves = [SectionGroup.from_str(s) for s in line.split(',', maxsplit=1)]
-        yield ElfPair(first_elf=elves[0], second_elf=elves[1])
+def iter_elf_pairs(input_data: InputData) -> Iterator[ElfPair]:
+    for line_num, line in enumerate(iter_lines(input_data), start=1):
+        try:
+            elves = [SectionGroup.from_str(s) for s in line.split(',' if isinstance(line, str) else b',', maxsplit=1)]
+            pair = ElfPair(first_elf=elves[0], second_elf=elves[1])
+        except (IndexError, ValueError, RuntimeError):
+            raise RuntimeError(f'Invalid input on line {line_num}: "{as_str(line)}"')
+        yield pair
+
+
+def read_sections_array(input_data: InputData):
+    # one row per elf pair: first_from, first_to, second_from, second_to. None for small inputs and for any
+    # input that is not exactly "a-b,c-d" on every line, those go through iter_elf_pairs which reports the error
+    if optional_numpy(len(input_data)) is None:
+        return None
+    sections = extract_line_records(input_data, (b'', b'-', b',', b'-', b''), signed=False)
+    if sections is None or (sections[:, 0] > sections[:, 1]).any() or (sections[:, 2] > sections[:, 3]).any():
+        return None
+    return sections
+
+
+def pair_counts_array(sections) -> Tuple[int, int]:
+    # (fully contained pairs, overlapping pairs), every comparison runs over whole columns
+    a, b, c, d = sections.T
+    contained = ((a >= c) & (b <= d)) | ((c >= a) & (d <= b))
+    overlapping = (a <= d) & (c <= b)
+    return int(contained.sum()), int(overlapping.sum())
+
+
+class SectionIndex:
+    # sorted start and end sections of every assignment, range queries are two binary searches
+    def __init__(self, groups: Iterable[Tuple[int, int]]):
+        starts, ends = [], []
+        for from_section, to_section in groups:
+            starts.append(from_section)
+            ends.append(to_section)
+        self.starts = sorted(starts)
+        self.ends = sorted(ends)
+
+    @classmethod
+    def from_input(cls, input_data: InputData) -> 'SectionIndex':
+        sections = read_sections_array(input_data)
+        if sections is not None:
+            return cls(zip(sections[:, 0::2].ravel().tolist(), sections[:, 1::2].ravel().tolist()))
+        return cls((g.from_section, g.to_section) for pair in iter_elf_pairs(input_data)
+                   for g in (pair.first_elf, pair.second_elf))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def count_overlapping(self, from_section: int, to_section: int) -> int:
+        if from_section > to_section:
+            raise RuntimeError(f'Invalid section range {from_section}-{to_section}')
+        # everything overlaps except assignments starting after the range or ending before it
+        starting_after = len(self.starts) - bisect_right(self.starts, to_section)
+        ending_before = bisect_left(self.ends, from_section)
+        return len(self.starts) - starting_after - ending_before
 
 
-def d4p1_solution(input_str: str) -> str:
+def d4p1_solution(input_data: InputData) -> str:
+    sections = read_sections_array(input_data)
+    if sections is not None:
+        return str(pair_counts_array(sections)[0])
     fully_contained_count = 0
-    for elf_pair in iter_elf_pairs(input_str):
+    for elf_pair in iter_elf_pairs(input_data):
         if elf_pair.first_elf.is_contained_in(elf_pair.second_elf) \
                 or elf_pair.second_elf.is_contained_in(elf_pair.first_elf):
             fully_contained_count += 1
     return str(fully_contained_count)
 
 
-def d4p2_solution(input_str: str) -> str:
-    return str(sum(pair.first_elf.overlaps_with(pair.second_elf) for pair in iter_elf_pairs(input_str)))
+def d4p2_solution(input_data: InputData) -> str:
+    sections = read_sections_array(input_data)
+    if sections is not None:
+        return str(pair_counts_array(sections)[1])
+    return str(sum(pair.first_elf.overlaps_with(pair.second_elf) for pair in iter_elf_pairs(input_data)))
 
 
 if __name__ == '__main__':
@@ -1,14 +1,14 @@
 import re
-from collections import deque
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import Tuple, List, Deque
+from typing import Dict, Tuple, List
 
-from common import line_iterator
+from common import iter_line_matches, line_iterator
 
 
 stack_legend_regex = re.compile(r'\n( +(?:\d{1,3} *)+)\n\n')
 crate_regex = re.compile(r'\[([A-Z])]')
-move_regex = re.compile(r'move (\d+) from (\d+) to (\d+)')
+move_regex = re.compile(r'^move (\d+) from (\d+) to (\d+)\r?$', re.MULTILINE)
 
 
 @dataclass
@@ -29,9 +29,10 @@ def split_input_parts(input_str: str) -> Tuple[str, str, int]:
     return crates, moves, stack_count
 
 
-def read_crates(crates_str: str, stack_count: int) -> List[Deque[str]]:
-    crates: List[Deque[str]] = [deque() for _ in range(stack_count)]
-    for line in line_iterator(crates_str):
+def read_crates(crates_str: str, stack_count: int) -> List[bytearray]:
+    # every stack is a bytearray of crate letters, bottom first
+    crates: List[bytearray] = [bytearray() for _ in range(stack_count)]
+    for line in reversed(list(line_iterator(crates_str))):
         for i in range(stack_count):
             p = i * 4
             if p > len(line):
@@ -39,15 +40,14 @@ def read_crates(crates_str: str, stack_count: int) -> List[Deque[str]]:
             cm = crate_regex.match(line[p:p+3])
             if cm is None:
                 continue
-            crates[i].appendleft(cm[1])
+            crates[i].append(ord(cm[1]))
     return crates
 
 
-def read_moves(moves_str: str, stack_count: int) -> List[Move]:
+def read_moves(moves_str: str, stack_count: int, first_line: int = 1) -> List[Move]:
     moves: List[Move] = []
     sr = range(stack_count)
-    for line in line_iterator(moves_str):
-        match = move_regex.match(line)
+    for match in iter_line_matches(move_regex, moves_str, first_line=first_line):
         move = Move(crate_num=int(match[1]), from_stack=int(match[2])-1, to_stack=int(match[3])-1)
         if move.from_stack not in sr or move.to_stack not in sr or move.from_stack == move.to_stack:
             raise RuntimeError()
@@ -55,37 +55,105 @@ def read_moves(moves_str: str, stack_count: int) -> List[Move]:
     return moves
 
 
-def read_all(input_str: str) -> Tuple[List[Deque[str]], List[Move]]:
+def read_all(input_str: str) -> Tuple[List[bytearray], List[Move]]:
     cs, ms, stack_count = split_input_parts(input_str)
     crates = read_crates(cs, stack_count)
-    moves = read_moves(ms, stack_count)
+    # moves start after the crate lines, the stack legend and a blank line
+    moves = read_moves(ms, stack_count, first_line=cs.count('\n') + 4)
     return crates, moves
 
 
-def execute_moves_9000(crates: List[Deque[str]], moves: List[Move]):
+def execute_move(crates: List[bytearray], move: Move, one_at_a_time: bool):
+    # one slice cut and one splice per move, no matter how many crates are moved
+    fs = crates[move.from_stack]
+    cut = len(fs) - move.crate_num
+    if cut < 0:
+        raise RuntimeError(f'Cannot move {move.crate_num} crates from stack {move.from_stack + 1}, it has {len(fs)}')
+    load = fs[cut:]
+    del fs[cut:]
+    if one_at_a_time:
+        # crates moved one by one end up in reverse order
+        load.reverse()
+    crates[move.to_stack] += load
+
+
+def execute_moves_9000(crates: List[bytearray], moves: List[Move]):
     for move in moves:
-        for _ in range(move.crate_num):
-            load: str = crates[move.from_stack].pop()
-            crates[move.to_stack].append(load)
+        execute_move(crates, move, one_at_a_time=True)
 
 
-def execute_moves_9001(crates: List[Deque[str]], moves: List[Move]):
+def execute_moves_9001(crates: List[bytearray], moves: List[Move]):
     for move in moves:
-        fs = crates[move.from_stack]
-        load: List[str] = list(fs.pop() for _ in range(move.crate_num))
-        crates[move.to_stack].extend(reversed(load))
+        execute_move(crates, move, one_at_a_time=False)
+
+
+def stack_tops(crates: List[bytearray]) -> str:
+    return ''.join(chr(c[-1]) for c in crates)
+
+
+class CraneReplay:
+    # runs the moves once and keeps a snapshot every interval moves, the interval doubles whenever the snapshots
+    # would take more than max_snapshot_bytes
+    def __init__(self, crates: List[bytearray], moves: List[Move], one_at_a_time: bool, interval: int = 1024,
+                 max_snapshot_bytes: int = 64 * 1024 * 1024):
+        if interval < 1:
+            raise RuntimeError('checkpoint interval must be positive')
+        self.moves = moves
+        self.one_at_a_time = one_at_a_time
+        self.interval = interval
+        self.max_snapshot_bytes = max_snapshot_bytes
+        self.checkpoints: Dict[int, Tuple[bytes, ...]] = {}
+        # move numbers of the checkpoints, saved in increasing order so the list stays sorted for bisect
+        self.checkpoint_moves: List[int] = []
+        self.snapshot_bytes = 0
+        self._save(0, crates)
+        for move_num, move in enumerate(moves, start=1):
+            execute_move(crates, move, one_at_a_time=one_at_a_time)
+            if move_num % self.interval == 0:
+                self._save(move_num, crates)
+        self.final_tops = stack_tops(crates)
+
+    @classmethod
+    def from_input(cls, input_str: str, one_at_a_time: bool, **kwargs) -> 'CraneReplay':
+        crates, moves = read_all(input_str)
+        return cls(crates, moves, one_at_a_time=one_at_a_time, **kwargs)
+
+    def _save(self, move_num: int, crates: List[bytearray]):
+        snapshot = tuple(bytes(c) for c in crates)
+        self.checkpoints[move_num] = snapshot
+        self.checkpoint_moves.append(move_num)
+        self.snapshot_bytes += sum(map(len, snapshot))
+        while self.snapshot_bytes > self.max_snapshot_bytes and len(self.checkpoints) > 1:
+            # multiples of the doubled interval are already saved, only every other checkpoint is dropped
+            self.interval *= 2
+            for n in [n for n in self.checkpoints if n % self.interval != 0]:
+                self.snapshot_bytes -= sum(map(len, self.checkpoints.pop(n)))
+            self.checkpoint_moves = list(self.checkpoints)
+
+    def stacks_after(self, move_num: int) -> List[bytearray]:
+        if not 0 <= move_num <= len(self.moves):
+            raise RuntimeError(f'move number must be between 0 and {len(self.moves)}, got {move_num}')
+        start = self.checkpoint_moves[bisect_right(self.checkpoint_moves, move_num) - 1]
+        crates = [bytearray(c) for c in self.checkpoints[start]]
+        for move in self.moves[start:move_num]:
+            execute_move(crates, move, one_at_a_time=self.one_at_a_time)
+        return crates
+
+    def tops_after(self, move_num: int) -> str:
+        # empty stacks show up as a space
+        return ''.join(chr(c[-1]) if c else ' ' for c in self.stacks_after(move_num))
 
 
 def d5p1_solution(input_str: str) -> str:
     crates, moves = read_all(input_str)
     execute_moves_9000(crates, moves)
-    return ''.join(c[-1] for c in crates)
+    return stack_tops(crates)
 
 
 def d5p2_solution(input_str: str) -> str:
     crates, moves = read_all(input_str)
     execute_moves_9001(crates, moves)
-    return ''.join(c[-1] for c in crates)
+    return stack_tops(crates)
 
 
 if __name__ == '__main__':
@@ -1,22 +1,48 @@
-from collections import deque
+from typing import Dict, Iterable, Optional, Sequence
 
+from common import iter_chunks, InputData
 
-def find_unique_char_end(datastream: str, char_count: int) -> int:
-    char_buf = deque(maxlen=char_count)
-    for i, c in enumerate(datastream):
-        char_buf.append(c)
-        if len(char_buf) < char_count:
-            continue
-        if len(set(char_buf)) == char_count:
-            return i + 1
 
+def find_markers(chunks: Iterable[bytes], window_sizes: Sequence[int]) -> Dict[int, Optional[int]]:
+    # single O(n) pass for every window size: the current duplicate-free run starts right after the last repeat
+    markers: Dict[int, Optional[int]] = {w: None for w in window_sizes}
+    pending = sorted(markers, reverse=True)
+    if not pending:
+        return markers
+    needed = pending.pop()
+    last_seen = [-1] * 256
+    run_start = offset = 0
+    for chunk in chunks:
+        for i, c in enumerate(chunk, offset):
+            if last_seen[c] >= run_start:
+                run_start = last_seen[c] + 1
+            last_seen[c] = i
+            # the run only ever grows by one, so each new length is checked as soon as it is reached
+            while i - run_start + 1 >= needed:
+                markers[needed] = i + 1
+                if not pending:
+                    return markers
+                needed = pending.pop()
+        offset += len(chunk)
+    return markers
 
-def d6p1_solution(input_str: str) -> str:
-    return str(find_unique_char_end(input_str, char_count=4))
 
+def iter_datastream(datastream: InputData) -> Iterable[bytes]:
+    if isinstance(datastream, str):
+        return [datastream.encode('utf8')]
+    return iter_chunks(datastream)
 
-def d6p2_solution(input_str: str) -> str:
-    return str(find_unique_char_end(input_str, char_count=14))
+
+def find_unique_char_end(datastream: InputData, char_count: int) -> Optional[int]:
+    return find_markers(iter_datastream(datastream), (char_count,))[char_count]
+
+
+def d6p1_solution(input_data: InputData) -> str:
+    return str(find_unique_char_end(input_data, char_count=4))
+
+
+def d6p2_solution(input_data: InputData) -> str:
+    return str(find_unique_char_end(input_data, char_count=14))
 
 
 if __name__ == '__main__':
@@ -1,8 +1,8 @@
 import re
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
 from dataclasses import dataclass, field
-from os.path import normpath
-from pathlib import PurePath
-from typing import Dict, Union, Iterator, Tuple
+from typing import Dict, List, Optional, Union, Iterator, Tuple
 
 from common import line_iterator
 
@@ -11,10 +11,16 @@ cmd_regex = re.compile(r'\$ (cd|ls)(?: ([\S]+))?')
 ls_out_regex = re.compile(r'(\d+|dir) (\S+)')
 
 
+DirPath = Tuple[str, ...]
+
+
 class ShellState:
-    def __init__(self):
-        self.cur_dir = PurePath('/')
+    def __init__(self, root_dir: 'Dir'):
+        self.cur_dir: DirPath = ()
         self.ls_output = False
+        # every scanned directory by its path below the root, so ls output never walks the tree from the root
+        self.dirs: Dict[DirPath, Dir] = {self.cur_dir: root_dir}
+        self.cur_dir_node: Optional[Dir] = root_dir
 
 
 @dataclass
@@ -27,45 +33,68 @@ class File:
 class Dir:
     name: str
     contents: Dict[str, Union[File, 'Dir']] = field(default_factory=dict)
+    cached_size: Optional[int] = field(default=None, compare=False, repr=False)
 
     @property
     def total_size(self) -> int:
-        ts = 0
-        for _, c in self.contents.items():
-            if isinstance(c, Dir):
-                ts += c.total_size
-            else:
-                ts += c.size
-        return ts
+        if self.cached_size is None:
+            compute_sizes(self)
+        return self.cached_size
+
+
+def compute_sizes(root_dir: Dir):
+    # post-order walk with an explicit stack, every directory is summed once after all of its subdirectories
+    stack: List[Tuple[Dir, bool]] = [(root_dir, False)]
+    while stack:
+        d, children_done = stack.pop()
+        if children_done:
+            d.cached_size = sum(c.cached_size if isinstance(c, Dir) else c.size for c in d.contents.values())
+            continue
+        stack.append((d, True))
+        stack.extend((c, False) for c in d.contents.values() if isinstance(c, Dir) and c.cached_size is None)
+
+
+def change_dir(cur_dir: DirPath, target: str) -> DirPath:
+    # same result as normpath on the joined path, '..' at the root stays at the root
+    if target == '..':
+        return cur_dir[:-1]
+    if '/' not in target and target != '.':
+        return cur_dir + (target,)
+    parts = [] if target.startswith('/') else list(cur_dir)
+    for p in target.split('/'):
+        if p == '..':
+            if parts:
+                parts.pop()
+        elif p and p != '.':
+            parts.append(p)
+    return tuple(parts)
 
 
 def execute_cmd(state: ShellState, line: str):
     cmd_match = cmd_regex.match(line)
     if cmd_match[1] == 'cd':
-        state.cur_dir = PurePath(normpath(state.cur_dir.joinpath(cmd_match[2].strip())))
+        state.cur_dir = change_dir(state.cur_dir, cmd_match[2].strip())
+        state.cur_dir_node = state.dirs.get(state.cur_dir)
     elif cmd_match[1] == 'ls':
         state.ls_output = True
 
 
 def process_ls_line(state: ShellState, dir_tree: Dir, line: str):
-    cd: Dir = dir_tree
-    for i, d in enumerate(state.cur_dir.parts):
-        d = d.strip()
-        if not d or (i == 0 and d == '/'):
-            continue
-        cd = cd.contents[d]
-        if not isinstance(cd, Dir):
-            raise RuntimeError(f'Error parsing ls output: directory not yet scanned: {line}')
+    cd = state.cur_dir_node
+    if cd is None:
+        raise RuntimeError(f'Error parsing ls output: directory not yet scanned: {line}')
     match = ls_out_regex.match(line)
     if match[1] == 'dir':
-        cd.contents[match[2]] = Dir(match[2])
+        new_dir = Dir(match[2])
+        cd.contents[match[2]] = new_dir
+        state.dirs[state.cur_dir + (match[2],)] = new_dir
     else:
         cd.contents[match[2]] = File(match[2], int(match[1]))
 
 
 def parse_input(input_str: str) -> Dir:
-    state = ShellState()
     dir_tree: Dir = Dir('/')
+    state = ShellState(dir_tree)
     for line in line_iterator(input_str):
         if line.startswith('$'):
             state.ls_output = False
@@ -75,41 +104,74 @@ def parse_input(input_str: str) -> Dir:
                 process_ls_line(state, dir_tree, line)
             else:
                 raise RuntimeError(f'Invalid input: unexpected output line: {line}')
+    compute_sizes(dir_tree)
     return dir_tree
 
 
 def dir_iter(root_dir: Dir) -> Iterator[Union[Dir, File]]:
+    # same pre-order as walking recursively, but deep trees cannot hit the recursion limit
     yield root_dir
-    for c in root_dir.contents.values():
+    stack: List[Iterator[Union[Dir, File]]] = [iter(root_dir.contents.values())]
+    while stack:
+        c = next(stack[-1], None)
+        if c is None:
+            stack.pop()
+            continue
+        yield c
         if isinstance(c, Dir):
-            for dc in dir_iter(c):
-                yield dc
-        else:
-            yield c
+            stack.append(iter(c.contents.values()))
+
+
+class DirSizeIndex:
+    # directory sizes sorted once with prefix sums, after that every query is a bisect or a slice
+    def __init__(self, root_dir: Dir):
+        self.root_size = root_dir.total_size
+        self.by_path: Dict[DirPath, int] = {}
+        stack: List[Tuple[DirPath, Dir]] = [((), root_dir)]
+        while stack:
+            path, d = stack.pop()
+            self.by_path[path] = d.total_size
+            stack.extend((path + (c.name,), c) for c in d.contents.values() if isinstance(c, Dir))
+        entries = sorted((size, path) for path, size in self.by_path.items())
+        self.sizes = [size for size, _ in entries]
+        self.paths = [path for _, path in entries]
+        self.prefix_sums = list(accumulate(self.sizes, initial=0))
+
+    @classmethod
+    def from_input(cls, input_str: str) -> 'DirSizeIndex':
+        return cls(parse_input(input_str))
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def sum_at_most(self, max_size: int) -> int:
+        return self.prefix_sums[bisect_right(self.sizes, max_size)]
+
+    def smallest_at_least(self, min_size: int) -> Optional[Tuple[int, DirPath]]:
+        i = bisect_left(self.sizes, min_size)
+        return (self.sizes[i], self.paths[i]) if i < len(self.sizes) else None
+
+    def largest(self, k: int) -> List[Tuple[int, DirPath]]:
+        start = max(len(self.sizes) - k, 0)
+        return list(zip(reversed(self.sizes[start:]), reversed(self.paths[start:])))
+
+    def size_of(self, path: Union[str, DirPath]) -> Optional[int]:
+        if isinstance(path, str):
+            path = change_dir((), path)
+        return self.by_path.get(path)
 
 
 def d7p1_solution(input_str: str) -> str:
-    res = 0
-    dir_tree = parse_input(input_str)
-    for item in dir_iter(dir_tree):
-        if isinstance(item, Dir):
-            ds = item.total_size
-            if ds <= 100000:
-                res += ds
-    return str(res)
+    return str(DirSizeIndex.from_input(input_str).sum_at_most(100000))
 
 
 def d7p2_solution(input_str: str) -> str:
     total_space, space_needed = 70000000, 30000000
-    dir_tree = parse_input(input_str)
-    free_space = total_space - dir_tree.total_size
-    to_delete: Tuple[int, Dir] = (total_space, dir_tree)
-    for item in dir_iter(dir_tree):
-        if isinstance(item, Dir):
-            ds = item.total_size
-            if free_space + ds >= space_needed and ds < to_delete[0]:
-                to_delete = (ds, item)
-    return str(to_delete[0])
+    index = DirSizeIndex.from_input(input_str)
+    free_space = total_space - index.root_size
+    to_delete = index.smallest_at_least(space_needed - free_space)
+    # the root itself always frees enough, sizes are capped at the disk size like before
+    return str(min(to_delete[0], total_space))
 
 
 if __name__ == '__main__':
@@ -1,95 +1,198 @@
-from enum import Enum
-from typing import List, Tuple, Optional
+import tempfile
+from array import array
+from mmap import mmap
+from operator import mul, or_
+from pathlib import Path
+from typing import List, Sequence, Tuple, Union
 
-from common import line_iterator
-
-
-class Direction(Enum):
-    Up = (0, -1)
-    Down = (0, 1)
-    Left = (-1, 0)
-    Right = (1, 0)
-
-
-class Pos:
-    __slots__ = ['x', 'y']
-
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-
-    def __add__(self, direction: Direction) -> 'Pos':
-        return Pos(self.x + direction.value[0], self.y + direction.value[1])
+from common import ByteBuffer, Grid2D, load_input_mmap, optional_numpy
 
 
 class Grid:
-    def __init__(self, grid: List[List[int]]):
-        self.height = len(grid)
-        if self.height < 1:
-            raise RuntimeError('height cannot be zero')
-        self.width = len(grid[0])
-        if self.width < 1:
-            raise RuntimeError('width cannot be zero')
-        if sum(len(row) != self.width for row in grid) > 0:
-            raise RuntimeError('inconsistent row width')
+    def __init__(self, grid: Grid2D):
+        self.height = grid.height
+        self.width = grid.width
         self.grid = grid
 
-    def get_tree(self, pos: Pos) -> int:
-        return self.grid[pos.y][pos.x]
-
-    def is_visible(self, pos: Pos) -> bool:
-        for d in Direction:
-            _, visible = self.look(from_pos=pos, direction=d)
-            if visible:
-                return True
-        return False
-
-    def in_bounds(self, pos: Pos) -> bool:
-        return 0 <= pos.x < self.width and 0 <= pos.y < self.height
-
-    def look(self, from_pos: Pos, direction: Direction) -> Tuple[List[int], bool]:
-        # return: (list(tree_height), can_see_edge)
-        res: List[int] = []
-        p: Pos = from_pos
-        th: int = self.get_tree(from_pos)
-        while True:
-            p += direction
-            if not self.in_bounds(p):
-                return res, True
-            res.append(self.get_tree(p))
-            if self.get_tree(p) >= th:
-                return res, False
+
+def sweep_line(heights: Sequence[int]) -> Tuple[bytearray, List[int]]:
+    # one sweep from each end of a row or column: a running maximum decides visibility and a monotonic stack of
+    # still unblocked trees gives the viewing distance, so every tree is pushed and popped at most once
+    n = len(heights)
+    visible = bytearray(n)
+    distances = [0] * n
+    tallest = -1
+    stack: List[int] = []
+    for i in range(n):
+        h = heights[i]
+        if h > tallest:
+            visible[i] = 1
+            tallest = h
+        while stack and heights[stack[-1]] < h:
+            stack.pop()
+        distances[i] = i - stack[-1] if stack else i
+        stack.append(i)
+    tallest = -1
+    stack.clear()
+    for i in range(n - 1, -1, -1):
+        h = heights[i]
+        if h > tallest:
+            visible[i] = 1
+            tallest = h
+        while stack and heights[stack[-1]] < h:
+            stack.pop()
+        distances[i] *= stack[-1] - i if stack else n - 1 - i
+        stack.append(i)
+    return visible, distances
+
+
+def tree_stats(grid: Grid) -> Tuple[int, int]:
+    # (visible tree count, best scenic score) in O(width * height)
+    g, w = grid.grid, grid.width
+    visible = bytearray()
+    # row products of viewing distances, at most width ** 2 each
+    row_scores = array('I' if w * w < 1 << 32 else 'Q')
+    for y in range(grid.height):
+        v, d = sweep_line(g.row(y))
+        visible += v
+        row_scores.extend(d)
+    best_score = 0
+    for x in range(w):
+        v, d = sweep_line(g.column(x))
+        visible[x::w] = bytes(map(or_, visible[x::w], v))
+        best_score = max(best_score, max(map(mul, row_scores[x::w], d)))
+    return visible.count(1), best_score
+
+
+def visible_mask_numpy(grid: Grid):
+    np = optional_numpy()
+    heights = np.frombuffer(grid.grid.cells, dtype=np.uint8).reshape(grid.height, grid.width).astype(np.int8)
+
+    def visible_from_start(h):
+        # tallest tree before each position along axis 1, -1 in front of the edge
+        before = np.empty_like(h)
+        before[:, 0] = -1
+        np.maximum.accumulate(h[:, :-1], axis=1, out=before[:, 1:])
+        return h > before
+
+    mask = visible_from_start(heights) | visible_from_start(heights[:, ::-1])[:, ::-1]
+    mask |= (visible_from_start(heights.T) | visible_from_start(heights.T[:, ::-1])[:, ::-1]).T
+    return mask
+
+
+def scan_lines(heights, tallest, blockers, first_pos: int) -> Tuple:
+    # walks axis 0 of a 2D height array, every step handles a whole row of independent lines at once;
+    # tallest (running maximum) and blockers (position of the last tree at least as tall as each height) are
+    # updated in place so a scan can continue in the next band
+    np = optional_numpy()
+    n, m = heights.shape
+    visible = np.empty((n, m), dtype=bool)
+    distances = np.empty((n, m), dtype=np.int32)
+    lines = np.arange(m)
+    levels = np.arange(10)[:, None]
+    for i in range(n):
+        row = heights[i]
+        np.greater(row, tallest, out=visible[i])
+        np.maximum(tallest, row, out=tallest)
+        distances[i] = first_pos + i - blockers[row, lines]
+        blockers[levels <= row] = first_pos + i
+    return visible, distances
+
+
+def new_scan_state(m: int, max_pos: int = 1 << 31) -> Tuple:
+    np = optional_numpy()
+    # positions count from the edge tree, which blocks the view of every height, and stay below max_pos
+    return np.full(m, -1, dtype=np.int8), np.zeros((10, m), dtype=np.int16 if max_pos < 1 << 15 else np.int32)
+
+
+def grid_layout(buffer: ByteBuffer) -> Tuple[int, int, int]:
+    # (width, height, bytes per line) of a grid file where every line has the same length
+    width = buffer.find(b'\n')
+    if width < 0:
+        width, stride = len(buffer), len(buffer) + 1
+    else:
+        stride = width + 1
+        if width > 0 and buffer[width - 1] == 13:
+            width -= 1
+    height = (len(buffer) + stride - width) // stride
+    if width < 1 or len(buffer) not in (height * stride - stride + width, height * stride):
+        raise RuntimeError('Invalid input: grid lines must all have the same length')
+    return width, height, stride
+
+
+def tree_stats_banded(source: Union[Path, str, ByteBuffer], band_cells: int = 1 << 22) -> Tuple[int, int]:
+    # same result as tree_stats, but the grid is read from a memory map in bands of rows. Per-column scan state at
+    # band boundaries goes to a temporary file, only one band of work arrays is kept in memory.
+    # pass 1 goes bottom-up and stores what every column sees below each band, pass 2 goes top-down and
+    # combines all four directions band by band.
+    np = optional_numpy()
+    if np is None:
+        raise RuntimeError('numpy is not installed')
+    buffer = source if isinstance(source, (bytes, bytearray, mmap)) else load_input_mmap(source)
+    width, height, stride = grid_layout(buffer)
+    band_rows = max(1, band_cells // width)
+    bands = [(y, min(y + band_rows, height)) for y in range(0, height, band_rows)]
+
+    def read_band(y0: int, y1: int):
+        count = min((y1 - y0) * stride, len(buffer) - y0 * stride)
+        rows = np.frombuffer(buffer, dtype=np.uint8, count=count, offset=y0 * stride)
+        rows = np.pad(rows, (0, (y1 - y0) * stride - count)).reshape(y1 - y0, stride)[:, :width] - 48
+        if (rows > 9).any():
+            raise RuntimeError('Invalid input: tree heights must be digits')
+        return rows.astype(np.int8)
+
+    # positions from the bottom edge are height - 1 - y
+    state = new_scan_state(width, height)
+    with tempfile.TemporaryFile() as tallest_file, tempfile.TemporaryFile() as blockers_file:
+        below_tallest = np.memmap(tallest_file, dtype=state[0].dtype, shape=(len(bands), width))
+        below_blockers = np.memmap(blockers_file, dtype=state[1].dtype, shape=(len(bands), 10, width))
+        for b in range(len(bands) - 1, -1, -1):
+            y0, y1 = bands[b]
+            below_tallest[b], below_blockers[b] = state
+            scan_lines(read_band(y0, y1)[::-1], *state, first_pos=height - y1)
+
+        visible_count = best_score = 0
+        above_state = new_scan_state(width, height)
+        for b, (y0, y1) in enumerate(bands):
+            band = read_band(y0, y1)
+            visible, score = scan_lines(band, *above_state, first_pos=y0)
+            # products of four distances need more than 32 bits
+            score = score.astype(np.int64)
+            below_state = np.array(below_tallest[b]), np.array(below_blockers[b])
+            v, d = scan_lines(band[::-1], *below_state, first_pos=height - y1)
+            visible |= v[::-1]
+            score *= d[::-1]
+            # rows are complete inside a band, left and right scans start fresh
+            v, d = scan_lines(band.T, *new_scan_state(y1 - y0, width), first_pos=0)
+            visible |= v.T
+            score *= d.T
+            v, d = scan_lines(band.T[::-1], *new_scan_state(y1 - y0, width), first_pos=0)
+            visible |= v[::-1].T
+            score *= d[::-1].T
+            visible_count += int(visible.sum())
+            best_score = max(best_score, int(score.max()))
+    return visible_count, best_score
 
 
 def read_input(input_str: str) -> Grid:
-    g: List[List[int]] = []
-    for line in line_iterator(input_str):
-        g.append([int(c) for c in line])
+    g = Grid2D.from_text(input_str, translation=Grid2D.digit_values)
+    if max(g.cells) > 9:
+        raise RuntimeError('Invalid input: tree heights must be digits')
     return Grid(grid=g)
 
 
 def d8p1_solution(input_str: str) -> str:
     grid: Grid = read_input(input_str)
-    visible_trees = 0
-    for x in range(grid.width):
-        for y in range(grid.height):
-            if grid.is_visible(Pos(x, y)):
-                visible_trees += 1
-    return str(visible_trees)
+    if optional_numpy(len(input_str)) is not None:
+        return str(int(visible_mask_numpy(grid).sum()))
+    return str(tree_stats(grid)[0])
 
 
 def d8p2_solution(input_str: str) -> str:
+    if optional_numpy(len(input_str)) is not None:
+        return str(tree_stats_banded(input_str.encode('utf8'))[1])
     grid: Grid = read_input(input_str)
-    best_tree: Optional[Tuple[Pos, int]] = None
-    for x in range(grid.width):
-        for y in range(grid.height):
-            score = 1
-            p = Pos(x, y)
-            for d in Direction:
-                score *= len(grid.look(from_pos=p, direction=d)[0])
-            if best_tree is None or best_tree[1] < score:
-                best_tree = (p, score)
-    return str(best_tree[1])
+    return str(tree_stats(grid)[1])
 
 
 if __name__ == '__main__':
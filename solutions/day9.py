@@ -1,7 +1,7 @@
 from enum import Enum
-from typing import List, Iterator, Tuple, Set, Optional
+from typing import List, Set, Tuple
 
-from common import line_iterator
+from common import as_str, extract_line_records, iter_lines, line_first_bytes, optional_numpy, pack, InputData
 
 
 class Direction(Enum):
@@ -11,6 +11,9 @@ class Direction(Enum):
     R = (1, 0)
 
 
+direction_letters = {d.name for d in Direction}
+
+
 class Move:
     __slots__ = ['direction', 'distance']
 
@@ -22,102 +25,82 @@ class Move:
         return f'Move({self.direction.name, self.distance})'
 
 
-class Pos:
-    __slots__ = ['x', 'y']
-
-    def __init__(self, x: int, y: int):
-        self.x = x
-        self.y = y
-
-    def __add__(self, direction: Direction) -> 'Pos':
-        return Pos(self.x + direction.value[0], self.y + direction.value[1])
-
-    def __sub__(self, other: 'Pos') -> Tuple[int, int]:
-        return self.x - other.x, self.y - other.y
-
-    def __repr__(self):
-        return f'Pos({self.x}, {self.y})'
-
-    def __eq__(self, other: 'Pos'):
-        return self.x == other.x and self.y == other.y
-
-    def __hash__(self):
-        return hash((self.x, self.y))
-
-
-def clamp_offset(offset: int) -> int:
-    if offset > 1:
-        return 1
-    if offset < -1:
-        return -1
-    return 0
-
-
-class Knot:
-    def __init__(self, child: Optional['Knot'], pos: Pos):
-        self.child = child
-        self.pos = pos
-
-    def update_child(self):
-        c = self.child
-        if c is None:
-            return
-        offset_x, offset_y = self.pos - c.pos
-        if abs(offset_x) > 1 or abs(offset_y) > 1:
-            c.pos = Pos(self.pos.x - clamp_offset(offset_x), self.pos.y - clamp_offset(offset_y))
-
-
-class State:
-    def __init__(self, start: Pos, knot_count: int):
-        if knot_count < 1:
-            raise RuntimeError('must have at least one knot')
-        self.knots = []
-        for _ in range(knot_count):
-            self.knots.append(Knot(child=(self.tail if self.knots else None), pos=start))
-        self.knots.reverse()
-
-    @property
-    def head(self) -> Knot:
-        return self.knots[0]
-
-    @property
-    def tail(self):
-        return self.knots[-1]
-
-    def step_iter(self, move: Move) -> Iterator[None]:
-        for i in range(move.distance):
-            self.head.pos += move.direction
-            for knot in self.knots:
-                knot.update_child()
-            yield
-
-
-def read_input(input_str: str) -> List[Move]:
+def read_input(input_data: InputData) -> List[Move]:
+    if optional_numpy(len(input_data)) is not None:
+        # every line has to be a direction letter, a space and the distance, anything else goes to the line parser
+        distances = extract_line_records(input_data, (b'? ', b''), signed=False)
+        letters = line_first_bytes(input_data).tobytes().decode('utf8') if distances is not None else ''
+        if distances is not None and set(letters) <= direction_letters:
+            return [Move(Direction[dr], dist) for dr, dist in zip(letters, distances[:, 0].tolist())]
     moves: List[Move] = []
-    for line in line_iterator(input_str):
-        dr, dist = line.split(' ', maxsplit=1)
-        moves.append(Move(Direction[dr], int(dist)))
+    for line_num, line in enumerate(iter_lines(input_data), start=1):
+        try:
+            dr, dist = as_str(line).split(maxsplit=1)
+            moves.append(Move(Direction[dr], int(dist)))
+        except (KeyError, ValueError):
+            raise RuntimeError(f'Invalid input on line {line_num}: "{as_str(line)}"')
     return moves
 
 
-def d9p1_solution(input_str: str) -> str:
-    moves = read_input(input_str)
-    state = State(Pos(0, 0), 2)
-    unique_tail_positions: Set[Pos] = set()
+def head_bounds(moves: List[Move]) -> Tuple[int, int, int, int]:
+    # (min_x, min_y, max_x, max_y) of the head's path, no knot can ever leave this box
+    x = y = min_x = min_y = max_x = max_y = 0
     for move in moves:
-        for _ in state.step_iter(move):
-            unique_tail_positions.add(state.tail.pos)
-    return str(len(unique_tail_positions))
-
-
-def d9p2_solution(input_str: str) -> str:
-    moves = read_input(input_str)
-    state = State(Pos(0, 0), 10)
-    unique_tail_positions: Set[Pos] = set()
+        dx, dy = move.direction.value
+        x += dx * move.distance
+        y += dy * move.distance
+        min_x, max_x = min(min_x, x), max(max_x, x)
+        min_y, max_y = min(min_y, y), max(max_y, y)
+    return min_x, min_y, max_x, max_y
+
+
+# largest bounding box (in cells) that gets a bitmap, 64 MiB
+max_bitmap_cells = 1 << 26
+
+
+def count_tail_positions(moves: List[Move], knot_count: int) -> int:
+    if knot_count < 1:
+        raise RuntimeError('must have at least one knot')
+    min_x, min_y, max_x, max_y = head_bounds(moves)
+    width, height = max_x - min_x + 1, max_y - min_y + 1
+    # knots are two flat int lists. Visited tail positions are one byte per cell of the bounding box, unless the
+    # box is so large that a set of packed positions along the path takes less memory.
+    xs = [-min_x] * knot_count
+    ys = [-min_y] * knot_count
+    bitmap = bytearray(width * height) if width * height <= max_bitmap_cells else None
+    visited: Set[int] = set()
+    tail = knot_count - 1
+    if bitmap is not None:
+        bitmap[ys[tail] * width + xs[tail]] = 1
+    else:
+        visited.add(pack(xs[tail], ys[tail]))
+    knots = range(1, knot_count)
     for move in moves:
-        for _ in state.step_iter(move):
-            unique_tail_positions.add(state.tail.pos)
-    return str(len(unique_tail_positions))
+        dx, dy = move.direction.value
+        for _ in range(move.distance):
+            xs[0] += dx
+            ys[0] += dy
+            for k in knots:
+                ox, oy = xs[k - 1] - xs[k], ys[k - 1] - ys[k]
+                if -1 <= ox <= 1 and -1 <= oy <= 1:
+                    # this knot stays put, so none of the knots behind it can move either
+                    break
+                xs[k] += (ox > 0) - (ox < 0)
+                ys[k] += (oy > 0) - (oy < 0)
+            else:
+                if bitmap is not None:
+                    bitmap[ys[tail] * width + xs[tail]] = 1
+                else:
+                    visited.add(pack(xs[tail], ys[tail]))
+    return bitmap.count(1) if bitmap is not None else len(visited)
+
+
+def d9p1_solution(input_data: InputData) -> str:
+    return str(count_tail_positions(read_input(input_data), knot_count=2))
+
+
+def d9p2_solution(input_data: InputData) -> str:
+    return str(count_tail_positions(read_input(input_data), knot_count=10))
 
 
 if __name__ == '__main__':